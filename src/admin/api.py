@@ -5,9 +5,9 @@ import secrets
 import json
 import uuid
 from typing import Optional, List, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Request, HTTPException, Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from src.database import DatabaseService
 from src.tools.registry import tool_registry
@@ -34,6 +34,17 @@ class AuthResponse(BaseModel):
     authenticated: bool
     message: Optional[str] = None
 
+class ClientResponse(BaseModel):
+    """Client row serialized directly from the ORM object"""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: uuid.UUID
+    name: str
+    description: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    is_active: bool
+
 class ClientSummary(BaseModel):
     id: str
     name: str
@@ -359,7 +370,7 @@ async def create_api_key(
     # Calculate expiry date if provided
     expires_at = None
     if key_data.expires_days:
-        expires_at = datetime.now() + timedelta(days=key_data.expires_days)
+        expires_at = datetime.now(timezone.utc) + timedelta(days=key_data.expires_days)
     
     # Create API key
     key = await db.create_api_key(client_id, api_key, key_data.name, expires_at)
@@ -439,12 +450,12 @@ async def delete_tool_configuration(
     return {"success": True, "message": f"Tool {tool_name} configuration removed"}
 
 
-@router.get("/clients")
+@router.get("/clients", response_model=List[ClientResponse])
 async def list_clients(request: Request, _: None = Depends(require_admin_auth)):
     """List all active clients (API endpoint)"""
     db: DatabaseService = request.app.state.db
-    clients = await db.list_clients()
-    return [client.to_dict() for client in clients]
+    # UUID/datetime serialization is done by pydantic-core, not per-row to_dict() calls
+    return await db.list_clients()
 
 
 @router.delete("/clients/{client_id}")
@@ -514,8 +525,10 @@ async def delete_resource_configuration(
 
 class ToolCallSummary(BaseModel):
     """Tool call summary response model"""
+    model_config = ConfigDict(from_attributes=True)
+    
     id: int
-    client_id: str
+    client_id: uuid.UUID
     tool_name: str
     input_data: Any  # Can be dict or list or other types
     output_text: Optional[Any]  # Text/content array responses
@@ -531,6 +544,7 @@ class ToolCallListResponse(BaseModel):
     total_count: int
     limit: int
     offset: int
+    next_before_id: Optional[int] = None  # Cursor for the next page (newest-first ordering)
     
 
 class ToolCallStatsResponse(BaseModel):
@@ -554,6 +568,7 @@ async def list_tool_calls(
     offset: int = 0,
     order_by: str = "created_at",
     order_dir: str = "desc",
+    before_id: Optional[int] = None,
     _: None = Depends(require_admin_auth)
 ):
     """List tool calls with pagination and filtering"""
@@ -573,6 +588,11 @@ async def list_tool_calls(
     if order_dir not in ["asc", "desc"]:
         raise HTTPException(status_code=400, detail="order_dir must be 'asc' or 'desc'")
     
+    # The before_id cursor only applies to newest-first ordering
+    uses_cursor = order_by == "created_at" and order_dir == "desc"
+    if before_id is not None and not uses_cursor:
+        raise HTTPException(status_code=400, detail="before_id requires order_by=created_at and order_dir=desc")
+    
     # Get tool calls
     tool_calls, total_count = await db.list_tool_calls(
         client_id=client_id,
@@ -581,30 +601,19 @@ async def list_tool_calls(
         limit=limit,
         offset=offset,
         order_by=order_by,
-        order_dir=order_dir
+        order_dir=order_dir,
+        before_id=before_id
     )
     
     # Convert to response format
-    tool_call_summaries = [
-        ToolCallSummary(
-            id=call.id,
-            client_id=str(call.client_id),
-            tool_name=call.tool_name,
-            input_data=call.input_data,
-            output_text=call.output_text,
-            output_json=call.output_json,
-            error_message=call.error_message,
-            execution_time_ms=call.execution_time_ms,
-            created_at=call.created_at
-        )
-        for call in tool_calls
-    ]
+    tool_call_summaries = [ToolCallSummary.model_validate(call) for call in tool_calls]
     
     return ToolCallListResponse(
         tool_calls=tool_call_summaries,
         total_count=total_count,
         limit=limit,
-        offset=offset
+        offset=offset,
+        next_before_id=tool_calls[-1].id if uses_cursor and len(tool_calls) == limit else None
     )
 
 
@@ -638,6 +647,7 @@ async def list_client_tool_calls(
     offset: int = 0,
     order_by: str = "created_at",
     order_dir: str = "desc",
+    before_id: Optional[int] = None,
     _: None = Depends(require_admin_auth)
 ):
     """List tool calls for a specific client"""
@@ -651,6 +661,7 @@ async def list_client_tool_calls(
         offset=offset,
         order_by=order_by,
         order_dir=order_dir,
+        before_id=before_id,
         _=_
     )
 
@@ -2,13 +2,14 @@
 SQLAlchemy-based database service
 """
 import logging
-from datetime import datetime, timedelta
+import os
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Optional, List, Union, Tuple
 import uuid
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
-from sqlalchemy import func, or_, and_, cast, String
+from sqlalchemy.orm import selectinload, configure_mappers
+from sqlalchemy import func, or_, and_, cast, String, insert, text, tuple_
 from contextlib import asynccontextmanager
 
 from .models import Base, Admin, KnowledgeBase, Client, APIKey, ToolConfiguration, ResourceConfiguration, ToolCall, SystemPrompt
@@ -58,14 +59,16 @@ class DatabaseService:
             if sslmode in ['require', 'verify-full', 'verify-ca']:
                 engine_kwargs["connect_args"] = {"ssl": True}
         
-        # Add connection pool settings following Neon best practices
+        # Add connection pool settings following Neon best practices; busy
+        # servers can raise them (e.g. DB_POOL_SIZE=20, DB_MAX_OVERFLOW=10)
         engine_kwargs.update({
-            "pool_size": 1,      # Neon recommends starting with smaller pools
-            "max_overflow": 9,   # Total max connections = 10 (following Neon guide)
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "1")),        # Neon recommends starting with smaller pools
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "9")),  # Total max connections = 10 by default (following Neon guide)
             "pool_timeout": 30,
             "pool_recycle": 3600,  # Recycle connections every hour
             "pool_pre_ping": True,  # Validate connections before use
             "echo": False,         # Set to True for SQL debugging
+            "insertmanyvalues_page_size": 10_000,  # Rows per multi-VALUES INSERT for bulk writes
         })
         
         self.engine = create_async_engine(database_url, **engine_kwargs)
@@ -76,7 +79,10 @@ class DatabaseService:
         )
     
     async def initialize(self):
-        """Initialize database - create superadmin"""
+        """Initialize database - resolve mappers and create superadmin"""
+        # Resolve relationship targets now rather than on the first query
+        configure_mappers()
+        
         # Create superadmin if no admins exist
         await self._create_superadmin_if_needed()
 
@@ -269,8 +275,34 @@ class DatabaseService:
             result = await session.execute(stmt)
             return list(result.scalars().all())
     
-    async def search_knowledge(self, query: str) -> List[KnowledgeBase]:
-        """Search knowledge base articles"""
+    def _filter_knowledge(
+        self,
+        stmt,
+        categories: Optional[List[str]] = None,
+        excluded_tags: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ):
+        """Apply category/tag filters and a row limit to a knowledge base query"""
+        if categories:
+            stmt = stmt.where(KnowledgeBase.category.in_(list(categories)))
+        if excluded_tags:
+            # Keep untagged articles and those sharing no tag with the excluded set
+            stmt = stmt.where(or_(
+                KnowledgeBase.tags.is_(None),
+                ~KnowledgeBase.tags.overlap(list(excluded_tags))
+            ))
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
+    
+    async def search_knowledge(
+        self,
+        query: str,
+        categories: Optional[List[str]] = None,
+        excluded_tags: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> List[KnowledgeBase]:
+        """Search knowledge base articles, optionally filtered by category and tags"""
         async with self.get_session() as session:
             # Simple text search in title and content
             search_term = f"%{query}%"
@@ -278,13 +310,20 @@ class DatabaseService:
                 (KnowledgeBase.title.ilike(search_term)) |
                 (KnowledgeBase.content.ilike(search_term))
             )
+            stmt = self._filter_knowledge(stmt, categories, excluded_tags, limit)
             result = await session.execute(stmt)
             return list(result.scalars().all())
     
-    async def list_knowledge_articles(self) -> List[KnowledgeBase]:
-        """List all knowledge base articles"""
+    async def list_knowledge_articles(
+        self,
+        categories: Optional[List[str]] = None,
+        excluded_tags: Optional[List[str]] = None,
+        limit: Optional[int] = None
+    ) -> List[KnowledgeBase]:
+        """List knowledge base articles, optionally filtered by category and tags"""
         async with self.get_session() as session:
             stmt = select(KnowledgeBase).order_by(KnowledgeBase.created_at.desc())
+            stmt = self._filter_knowledge(stmt, categories, excluded_tags, limit)
             result = await session.execute(stmt)
             return list(result.scalars().all())
     
@@ -321,7 +360,7 @@ class DatabaseService:
                 APIKey.key_value == api_key,
                 APIKey.is_active == True,
                 Client.is_active == True,
-                or_(APIKey.expires_at.is_(None), APIKey.expires_at > datetime.now())
+                or_(APIKey.expires_at.is_(None), APIKey.expires_at > datetime.now(timezone.utc))
             )
             result = await session.execute(stmt)
             return result.scalar_one_or_none()
@@ -439,7 +478,7 @@ class DatabaseService:
             stmt = select(APIKey).where(
                 APIKey.key_value == key_value, 
                 APIKey.is_active == True,
-                or_(APIKey.expires_at.is_(None), APIKey.expires_at > datetime.now())
+                or_(APIKey.expires_at.is_(None), APIKey.expires_at > datetime.now(timezone.utc))
             )
             result = await session.execute(stmt)
             return result.scalar_one_or_none()
@@ -667,41 +706,22 @@ class DatabaseService:
     
     # Tool Call Tracking Methods
     
-    async def create_tool_call(
-        self, 
-        client_id: Union[str, uuid.UUID], 
-        api_key_id: int,
-        tool_name: str,
-        input_data: Dict[str, Any],
-        output_text: Optional[Dict[str, Any]] = None,
-        output_json: Optional[Dict[str, Any]] = None,
-        error_message: Optional[str] = None,
-        execution_time_ms: Optional[int] = None
-    ) -> Optional[ToolCall]:
-        """Create a tool call record for tracking"""
-        if isinstance(client_id, str):
-            client_id = uuid.UUID(client_id)
-            
+    async def create_tool_calls(self, records: List[Dict[str, Any]]) -> int:
+        """Create tool call records in bulk using a single multi-row INSERT"""
+        if not records:
+            return 0
+
         try:
             async with self.get_session() as session:
-                tool_call = ToolCall(
-                    client_id=client_id,
-                    api_key_id=api_key_id,
-                    tool_name=tool_name,
-                    input_data=input_data,
-                    output_text=output_text,
-                    output_json=output_json,
-                    error_message=error_message,
-                    execution_time_ms=execution_time_ms
-                )
-                session.add(tool_call)
+                # Audit rows are already buffered in memory, so a lost commit on crash is acceptable
+                await session.execute(text("SET LOCAL synchronous_commit = OFF"))
+                await session.execute(insert(ToolCall), records)
                 await session.commit()
-                await session.refresh(tool_call)
-                return tool_call
+                return len(records)
         except Exception as e:
-            logger.error(f"Error creating tool call record: {e}")
-            return None
-    
+            logger.error(f"Error creating {len(records)} tool call records: {e}")
+            return 0
+
     async def list_tool_calls(
         self,
         client_id: Optional[Union[str, uuid.UUID]] = None,
@@ -710,9 +730,16 @@ class DatabaseService:
         limit: int = 50,
         offset: int = 0,
         order_by: str = "created_at",
-        order_dir: str = "desc"
+        order_dir: str = "desc",
+        before_id: Optional[int] = None
     ) -> Tuple[List[ToolCall], int]:
-        """List tool calls with optional filtering, pagination and search"""
+        """List tool calls with optional filtering, pagination and search
+        
+        When before_id is given with the default newest-first ordering, the page
+        starts after that call (keyset pagination) and offset is ignored. If that
+        call no longer exists the page is empty. before_id is ignored for other
+        orderings.
+        """
         if isinstance(client_id, str):
             client_id = uuid.UUID(client_id)
             
@@ -751,17 +778,36 @@ class DatabaseService:
             else:
                 order_col = ToolCall.created_at
             
+            # id breaks ties between calls flushed in the same batch
             if order_dir == "desc":
-                query = query.order_by(order_col.desc())
+                query = query.order_by(order_col.desc(), ToolCall.id.desc())
             else:
-                query = query.order_by(order_col.asc())
+                query = query.order_by(order_col.asc(), ToolCall.id.asc())
             
             # Apply pagination
-            query = query.limit(limit).offset(offset)
+            anchor_missing = False
+            if before_id is not None and order_by == "created_at" and order_dir == "desc":
+                anchor_result = await session.execute(
+                    select(ToolCall.created_at).where(ToolCall.id == before_id)
+                )
+                anchor_created_at = anchor_result.scalar_one_or_none()
+                if anchor_created_at is None:
+                    # Don't silently restart from the first page
+                    anchor_missing = True
+                else:
+                    query = query.where(
+                        tuple_(ToolCall.created_at, ToolCall.id) < tuple_(anchor_created_at, before_id)
+                    )
+                query = query.limit(limit)
+            else:
+                query = query.limit(limit).offset(offset)
             
             # Execute queries
-            result = await session.execute(query)
-            tool_calls = result.scalars().all()
+            if anchor_missing:
+                tool_calls = []
+            else:
+                result = await session.execute(query)
+                tool_calls = result.scalars().all()
             
             count_result = await session.execute(count_query)
             total_count = count_result.scalar()
@@ -779,7 +825,7 @@ class DatabaseService:
             
         async with self.get_session() as session:
             # Date filter for last N days
-            since_date = datetime.utcnow() - timedelta(days=days)
+            since_date = datetime.now(timezone.utc) - timedelta(days=days)
             
             base_filter = ToolCall.created_at >= since_date
             if client_id:
@@ -916,6 +962,8 @@ class DatabaseService:
             deactivate_result = await session.execute(deactivate_query)
             for prompt in deactivate_result.scalars():
                 prompt.is_active = False
+            # Flush before activating so the one-active-prompt index never sees two
+            await session.flush()
             
             # Then activate the specified prompt
             activate_query = select(SystemPrompt).where(
@@ -21,6 +21,8 @@ from .server.factory import MCPServerFactory
 from .admin import admin_router
 from .tools.registry import tool_registry
 from .resources.registry import resource_registry
+from .services.email import close_email_service
+from .services.embeddings import close_embeddings_service
 
 load_dotenv()
 
@@ -58,18 +60,19 @@ async def lifespan(app: FastAPI):
     app.state.db = DatabaseService(database_url)
     await app.state.db.initialize()
     
-    # Initialize MCP server factory
+    # Initialize MCP server factory (discovers tools and initializes resources)
     app.state.mcp_factory = MCPServerFactory(app.state.db)
     
     # Start the tool execution queue
     await tool_registry.ensure_queue_started()
     
-    # Initialize resource registry with database (triggers seeding if needed)
-    resource_registry.initialize(app.state.db)
-    
     yield
     
     # Cleanup
+    await tool_registry.flush_tool_calls()
+    await resource_registry.close()
+    await close_email_service()
+    await close_embeddings_service()
     await app.state.db.close()
 
 
@@ -170,7 +173,7 @@ async def mcp_handler(token: str, request: Request, background_tasks: Background
             )
         
         # Try new API key system first
-        mcp_server = await app.state.mcp_factory.get_server(token)
+        mcp_server = await app.state.mcp_factory.get_server(token, request)
         if mcp_server:
             # New API key system
             return await mcp_server.handle_request(request, background_tasks)
@@ -0,0 +1,59 @@
+"""20251016_090000_core_halfvec_youtube_embeddings
+
+Revision ID: a3e1c5d7f9b2
+Revises: f9ce3b275c4a
+Create Date: 2025-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e1c5d7f9b2'
+down_revision: Union[str, None] = 'f9ce3b275c4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Store embeddings as fp16 to halve the bytes read per similarity comparison
+    op.alter_column(
+        'youtube_chunks',
+        'embedding',
+        type_=pgvector.sqlalchemy.HALFVEC(dim=1024),
+        existing_type=pgvector.sqlalchemy.vector.VECTOR(dim=1024),
+        existing_nullable=True,
+        postgresql_using='embedding::halfvec(1024)'
+    )
+
+    # HNSW index for cosine similarity
+    op.create_index(
+        'ix_youtube_embedding_hnsw',
+        'youtube_chunks',
+        ['embedding'],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_ops={'embedding': 'halfvec_cosine_ops'},
+        postgresql_with={'m': 16, 'ef_construction': 64}
+    )
+
+    # Composite prefilter for per-project searches
+    op.create_index('ix_youtube_project_slug_video', 'youtube_chunks', ['project_slug', 'video_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_youtube_project_slug_video', table_name='youtube_chunks')
+    op.drop_index('ix_youtube_embedding_hnsw', table_name='youtube_chunks', postgresql_using='hnsw')
+
+    op.alter_column(
+        'youtube_chunks',
+        'embedding',
+        type_=pgvector.sqlalchemy.vector.VECTOR(dim=1024),
+        existing_type=pgvector.sqlalchemy.HALFVEC(dim=1024),
+        existing_nullable=True,
+        postgresql_using='embedding::vector(1024)'
+    )
@@ -0,0 +1,45 @@
+"""20251016_103000_core_knowledge_tags_text_array
+
+Revision ID: a8d3e5f7b9c2
+Revises: f7c2d4e6a8b0
+Create Date: 2025-10-16 10:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d3e5f7b9c2'
+down_revision: Union[str, None] = 'f7c2d4e6a8b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ALTER ... USING cannot contain a subquery, so copy through a new column
+    op.add_column('knowledge_base', sa.Column('tags_array', postgresql.ARRAY(sa.Text()), nullable=True))
+    op.execute("""
+        UPDATE knowledge_base
+        SET tags_array = ARRAY(SELECT jsonb_array_elements_text(tags))
+        WHERE tags IS NOT NULL AND jsonb_typeof(tags) = 'array'
+    """)
+    op.drop_column('knowledge_base', 'tags')
+    op.alter_column('knowledge_base', 'tags_array', new_column_name='tags')
+
+    op.create_index('ix_kb_tags_gin', 'knowledge_base', ['tags'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_kb_tags_gin', table_name='knowledge_base', postgresql_using='gin')
+
+    op.add_column('knowledge_base', sa.Column('tags_json', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.execute("""
+        UPDATE knowledge_base
+        SET tags_json = to_jsonb(tags)
+        WHERE tags IS NOT NULL
+    """)
+    op.drop_column('knowledge_base', 'tags')
+    op.alter_column('knowledge_base', 'tags_json', new_column_name='tags')
@@ -0,0 +1,29 @@
+"""20251016_091500_core_hash_index_api_keys
+
+Revision ID: b7d2e4f6a8c1
+Revises: a3e1c5d7f9b2
+Create Date: 2025-10-16 09:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e4f6a8c1'
+down_revision: Union[str, None] = 'a3e1c5d7f9b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # API keys are only looked up by equality; replace the unique btree with a hash index
+    op.drop_index(op.f('ix_api_keys_key_value'), table_name='api_keys')
+    op.create_index('ix_api_keys_key_hash', 'api_keys', ['key_value'], unique=False, postgresql_using='hash')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_api_keys_key_hash', table_name='api_keys', postgresql_using='hash')
+    op.create_index(op.f('ix_api_keys_key_value'), 'api_keys', ['key_value'], unique=True)
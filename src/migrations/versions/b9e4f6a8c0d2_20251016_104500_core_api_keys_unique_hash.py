@@ -0,0 +1,30 @@
+"""20251016_104500_core_api_keys_unique_hash
+
+Revision ID: b9e4f6a8c0d2
+Revises: a8d3e5f7b9c2
+Create Date: 2025-10-16 10:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e4f6a8c0d2'
+down_revision: Union[str, None] = 'a8d3e5f7b9c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Hash indexes can't be UNIQUE, but an exclusion constraint over a hash index
+    # enforces uniqueness and still serves the equality lookups
+    op.drop_index('ix_api_keys_key_hash', table_name='api_keys', postgresql_using='hash')
+    op.execute("ALTER TABLE api_keys ADD CONSTRAINT uq_api_keys_key_value EXCLUDE USING hash (key_value WITH =)")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE api_keys DROP CONSTRAINT uq_api_keys_key_value")
+    op.create_index('ix_api_keys_key_hash', 'api_keys', ['key_value'], unique=False, postgresql_using='hash')
@@ -0,0 +1,42 @@
+"""20251016_093000_core_partial_active_indexes
+
+Revision ID: c4f8a1b3d5e7
+Revises: b7d2e4f6a8c1
+Create Date: 2025-10-16 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f8a1b3d5e7'
+down_revision: Union[str, None] = 'b7d2e4f6a8c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Partial index covering only active API keys
+    op.create_index('ix_api_keys_active', 'api_keys', ['client_id'], unique=False, postgresql_where=sa.text('is_active'))
+
+    # Keep only the newest active prompt per client before enforcing uniqueness
+    op.execute("""
+        UPDATE system_prompts sp
+        SET is_active = false
+        WHERE sp.is_active
+          AND EXISTS (
+            SELECT 1 FROM system_prompts newer
+            WHERE newer.client_id = sp.client_id
+              AND newer.is_active
+              AND newer.version > sp.version
+          )
+    """)
+    op.create_index('ix_system_prompts_active', 'system_prompts', ['client_id'], unique=True, postgresql_where=sa.text('is_active'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_system_prompts_active', table_name='system_prompts')
+    op.drop_index('ix_api_keys_active', table_name='api_keys')
@@ -0,0 +1,35 @@
+"""20251016_094500_core_youtube_url_generated_column
+
+Revision ID: d5a9b2c4e6f8
+Revises: c4f8a1b3d5e7
+Create Date: 2025-10-16 09:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a9b2c4e6f8'
+down_revision: Union[str, None] = 'c4f8a1b3d5e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Stored generated column, filled for existing rows by the ALTER itself
+    op.add_column('youtube_chunks', sa.Column(
+        'youtube_url',
+        sa.Text(),
+        sa.Computed(
+            "'https://www.youtube.com/watch?v=' || video_id || '&t=' || floor(start_timestamp)::int::text || 's'",
+            persisted=True
+        ),
+        nullable=True
+    ))
+
+
+def downgrade() -> None:
+    op.drop_column('youtube_chunks', 'youtube_url')
@@ -0,0 +1,26 @@
+"""20251016_100000_core_tool_calls_client_created_index
+
+Revision ID: e6b1c3d5f7a9
+Revises: d5a9b2c4e6f8
+Create Date: 2025-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b1c3d5f7a9'
+down_revision: Union[str, None] = 'd5a9b2c4e6f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_tool_calls_client_created', 'tool_calls', ['client_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tool_calls_client_created', table_name='tool_calls')
@@ -0,0 +1,62 @@
+"""20251016_101500_core_timestamptz_columns
+
+Revision ID: f7c2d4e6a8b0
+Revises: e6b1c3d5f7a9
+Create Date: 2025-10-16 10:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c2d4e6a8b0'
+down_revision: Union[str, None] = 'e6b1c3d5f7a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, nullable, has server default)
+TIMESTAMP_COLUMNS = [
+    ('clients', 'created_at', False, True),
+    ('clients', 'updated_at', False, True),
+    ('api_keys', 'created_at', False, True),
+    ('api_keys', 'expires_at', True, False),
+    ('tool_configurations', 'created_at', False, True),
+    ('tool_configurations', 'updated_at', False, True),
+    ('resource_configurations', 'created_at', False, True),
+    ('resource_configurations', 'updated_at', False, True),
+    ('knowledge_base', 'created_at', False, True),
+    ('tool_calls', 'created_at', False, True),
+    ('system_prompts', 'created_at', False, True),
+    ('system_prompts', 'updated_at', False, True),
+]
+
+
+def upgrade() -> None:
+    # Existing naive values were written in UTC
+    for table, column, nullable, has_default in TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.DateTime(timezone=True),
+            existing_type=sa.DateTime(),
+            existing_nullable=nullable,
+            server_default=sa.text('now()') if has_default else None,
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'"
+        )
+
+
+def downgrade() -> None:
+    for table, column, nullable, has_default in TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.DateTime(),
+            existing_type=sa.DateTime(timezone=True),
+            existing_nullable=nullable,
+            server_default=None,
+            postgresql_using=f"{column} AT TIME ZONE 'UTC'"
+        )
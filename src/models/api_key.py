@@ -4,8 +4,8 @@ API Key model for multi-tenant system
 from datetime import datetime
 from typing import Dict, Any, Optional
 import uuid
-from sqlalchemy import Boolean, DateTime, Integer, String, func, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Boolean, DateTime, Index, Integer, String, func, ForeignKey, text
+from sqlalchemy.dialects.postgresql import UUID, ExcludeConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -20,13 +20,20 @@ class APIKey(Base):
     """Model for API keys (multiple per client)"""
     
     __tablename__ = "api_keys"
+    __table_args__ = (
+        # Keys are only ever looked up by equality, so a hash index beats a btree;
+        # the exclusion constraint keeps them unique (hash indexes can't be UNIQUE)
+        ExcludeConstraint(("key_value", "="), name="uq_api_keys_key_value", using="hash"),
+        # Only active keys are ever listed or authenticated against
+        Index("ix_api_keys_active", "client_id", postgresql_where=text("is_active")),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     client_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("clients.id"), nullable=False)
-    key_value: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
+    key_value: Mapped[str] = mapped_column(String(255), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)  # "Production", "Dev", etc.
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
-    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     
     # Relationships
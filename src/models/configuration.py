@@ -25,8 +25,8 @@ class ToolConfiguration(Base):
     client_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("clients.id"), nullable=False)
     tool_name: Mapped[str] = mapped_column(String(255), nullable=False)
     configuration: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True)  # NULL allowed
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
     # Relationships
     client: Mapped["Client"] = relationship("Client", back_populates="tool_configurations")
@@ -60,8 +60,8 @@ class ResourceConfiguration(Base):
     client_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("clients.id"), nullable=False)
     resource_name: Mapped[str] = mapped_column(String(255), nullable=False)
     configuration: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True)  # NULL allowed
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
     # Relationships
     client: Mapped["Client"] = relationship("Client", back_populates="resource_configurations")
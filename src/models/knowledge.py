@@ -3,8 +3,8 @@ Knowledge Base models
 """
 from datetime import datetime
 from typing import Dict, Any, Optional, List
-from sqlalchemy import DateTime, Integer, String, Text, func
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import DateTime, Index, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
@@ -14,13 +14,17 @@ class KnowledgeBase(Base):
     """Model for knowledge base articles and resources"""
     
     __tablename__ = "knowledge_base"
+    __table_args__ = (
+        # Tag containment lookups (tags @> ARRAY[...])
+        Index("ix_kb_tags_gin", "tags", postgresql_using="gin"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     category: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
-    tags: Mapped[Optional[List[str]]] = mapped_column(JSONB, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    tags: Mapped[Optional[List[str]]] = mapped_column(ARRAY(Text), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     def __repr__(self) -> str:
         return f"<KnowledgeBase(id={self.id}, title='{self.title}', category='{self.category}')>"
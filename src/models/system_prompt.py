@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional, Dict, Any
-from sqlalchemy import Integer, String, Text, Boolean, ForeignKey, DateTime, JSON
+from sqlalchemy import Integer, String, Text, Boolean, ForeignKey, DateTime, JSON, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -16,6 +16,10 @@ if TYPE_CHECKING:
 
 class SystemPrompt(Base):
     __tablename__ = "system_prompts"
+    __table_args__ = (
+        # At most one active prompt per client, and a small index for looking it up
+        Index("ix_system_prompts_active", "client_id", unique=True, postgresql_where=text("is_active")),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     client_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("clients.id"), nullable=False)
@@ -25,8 +29,8 @@ class SystemPrompt(Base):
     generation_context: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSON, nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     parent_version_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("system_prompts.id"), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     
     # Relationships
     client: Mapped["Client"] = relationship("Client", back_populates="system_prompts")
@@ -4,7 +4,7 @@ Tool call tracking model for auditing and monitoring
 from datetime import datetime
 from typing import Dict, Any, Optional
 import uuid
-from sqlalchemy import DateTime, Integer, String, Text, func, ForeignKey
+from sqlalchemy import DateTime, Index, Integer, String, Text, func, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -13,13 +13,18 @@ from .base import Base
 # Import for type hints
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from .client import Client, APIKey
+    from .client import Client
+    from .api_key import APIKey
 
 
 class ToolCall(Base):
     """Model for tracking tool call executions"""
     
     __tablename__ = "tool_calls"
+    __table_args__ = (
+        # Serves per-client listings and keyset pagination, newest first
+        Index("ix_tool_calls_client_created", "client_id", "created_at"),
+    )
     
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     client_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("clients.id"), nullable=False)
@@ -30,7 +35,7 @@ class ToolCall(Base):
     output_json: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True)  # Structured JSON responses
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # If tool failed
     execution_time_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # Duration in milliseconds
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=func.now(), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
     client: Mapped["Client"] = relationship("Client")
@@ -2,8 +2,8 @@
 YouTube chunk model for vector similarity search
 """
 
-from sqlalchemy import Column, Integer, String, Text, REAL
-from pgvector.sqlalchemy import Vector
+from sqlalchemy import Column, Computed, Index, Integer, String, Text, REAL
+from pgvector.sqlalchemy import HALFVEC
 from .base import Base
 
 
@@ -11,6 +11,18 @@ class YouTubeChunk(Base):
     """YouTube video chunk with embeddings for similarity search"""
     
     __tablename__ = "youtube_chunks"
+    __table_args__ = (
+        # Approximate nearest neighbour index for cosine similarity search
+        Index(
+            "ix_youtube_embedding_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_ops={"embedding": "halfvec_cosine_ops"},
+            postgresql_with={"m": 16, "ef_construction": 64},
+        ),
+        # Narrows per-project searches before the vector comparison
+        Index("ix_youtube_project_slug_video", "project_slug", "video_id"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     project_slug = Column(String(255), nullable=False, index=True)
@@ -22,7 +34,15 @@ class YouTubeChunk(Base):
     text = Column(Text, nullable=False)
     word_count = Column(Integer, nullable=False)
     sentence_count = Column(Integer, nullable=False)
-    embedding = Column(Vector(1024), nullable=True)
+    embedding = Column(HALFVEC(1024), nullable=True)  # fp16 halves bytes per row
+    # Built once at write time so search results don't format URLs per row
+    youtube_url = Column(
+        Text,
+        Computed(
+            "'https://www.youtube.com/watch?v=' || video_id || '&t=' || floor(start_timestamp)::int::text || 's'",
+            persisted=True
+        )
+    )
     
     def __repr__(self):
         return f"<YouTubeChunk(project_slug='{self.project_slug}', video_id='{self.video_id}', chunk_index={self.chunk_index})>"
@@ -45,5 +65,5 @@ class YouTubeChunk(Base):
             "text": self.text,
             "word_count": self.word_count,
             "sentence_count": self.sentence_count,
-            "youtube_url": self.get_youtube_url()
+            "youtube_url": self.youtube_url or self.get_youtube_url()
         }
\ No newline at end of file
@@ -3,19 +3,82 @@ Base classes for modular MCP resources using Pydantic
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Callable, ClassVar, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Type
 from pydantic import BaseModel, Field
+from pydantic_core import from_json
 import csv
-import json
+import functools
+import io
 import logging
 from pathlib import Path
 import aiohttp
 import asyncio
 
+from sqlalchemy import insert, literal, select
+
 from .types import MCPResource, ResourceContent
+from ..utils.schema_validation import compile_schema_validator
 
 logger = logging.getLogger(__name__)
 
+# Rows inserted per COPY/INSERT while seeding, bounding memory for large sources
+SEED_BATCH_SIZE = 10_000
+
+
+# Shared HTTP session for seed fetches, created on first use
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+async def _get_http_session() -> aiohttp.ClientSession:
+    """Get the shared HTTP session, creating it on first use"""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=60)
+        )
+    return _http_session
+
+
+async def close_http_session() -> None:
+    """Close the shared HTTP session (called on application shutdown)"""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+
+@functools.lru_cache(maxsize=None)
+def _model_column_map(model_class) -> Tuple[FrozenSet[str], Dict[str, str]]:
+    """Column names of a model and a lowercase -> column name map, computed once per model"""
+    columns = frozenset(col.name for col in model_class.__table__.columns)
+    return columns, {name.lower(): name for name in columns}
+
+
+@functools.lru_cache(maxsize=None)
+def _any_row_statement(model_class):
+    """SELECT 1 ... LIMIT 1 for a model, built once so its compiled form is cached"""
+    return select(literal(1)).select_from(model_class).limit(1)
+
+
+class _SeedKeyMap(dict):
+    """Maps seed field names to model columns (or None), resolving each distinct name once.
+    
+    Seed rows share the same handful of keys, so after the first row every
+    lookup is a plain dict hit with no lower() call.
+    """
+    
+    def __init__(self, columns: FrozenSet[str], lower_columns: Dict[str, str]):
+        super().__init__()
+        self._columns = columns
+        self._lower_columns = lower_columns
+    
+    def __missing__(self, key: str) -> Optional[str]:
+        # Exact match first, then case-insensitive
+        column = key if key in self._columns else self._lower_columns.get(key.lower())
+        self[key] = column
+        return column
+
 
 class ResourceSchema(BaseModel):
     """Pydantic model for MCP resource schema definition"""
@@ -34,32 +97,51 @@ class BaseResource(ABC):
     # Optional seed source - can be local file path or URL
     seed_source: Optional[str] = None
     
+    # Subclasses by defining module, filled in as resource modules are imported
+    _subclasses_by_module: ClassVar[Dict[str, List[Type["BaseResource"]]]] = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        BaseResource._subclasses_by_module.setdefault(cls.__module__, []).append(cls)
+    
     def __init__(self):
         self._db = None
-        self._initialized = False
+        self._init_task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
     
     def set_database(self, db):
         """Set database service for resources that need it"""
         self._db = db
-        # Run initialization on first database set
-        if not self._initialized:
-            asyncio.create_task(self.initialize())
+        # Run initialization once, on first database set
+        if self._init_task is None:
+            self._init_task = asyncio.create_task(self._init_once())
     
     async def initialize(self):
-        """Initialize resource and seed if table is empty"""
-        if self._initialized:
+        """Initialize resource and seed if table is empty (runs at most once)"""
+        if self._init_task is None:
+            self._init_task = asyncio.create_task(self._init_once())
+        await asyncio.shield(self._init_task)
+    
+    async def wait_ready(self):
+        """Wait until initialization (including seeding) has finished"""
+        if self._init_task is None:
+            # No database set, so there is nothing to wait for
             return
-            
-        self._initialized = True
-        
-        # Check if we should seed data
-        if self.seed_source and self._db:
-            try:
-                if await self._is_table_empty():
-                    logger.info(f"Table empty for resource {self.name}, seeding from {self.seed_source}")
-                    await self._seed_data()
-            except Exception as e:
-                logger.error(f"Failed to seed data for resource {self.name}: {e}")
+        await self._ready.wait()
+    
+    async def _init_once(self):
+        """Seed data if needed, then mark the resource ready"""
+        try:
+            # Check if we should seed data
+            if self.seed_source and self._db:
+                try:
+                    if await self._is_table_empty():
+                        logger.info(f"Table empty for resource {self.name}, seeding from {self.seed_source}")
+                        await self._seed_data()
+                except Exception as e:
+                    logger.error(f"Failed to seed data for resource {self.name}: {e}")
+        finally:
+            self._ready.set()
     
     @property
     @abstractmethod
@@ -103,37 +185,15 @@ class BaseResource(ABC):
         """Validate if this resource can handle the given URI"""
         return uri.startswith(f"{self.uri_scheme}://")
     
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _compiled_config_validator(cls) -> Callable[[Dict[str, Any]], bool]:
+        """Compile the config schema once per resource class"""
+        return compile_schema_validator(cls.get_config_schema())
+    
     def validate_config(self, config: Dict[str, Any]) -> bool:
         """Validate configuration against the config schema (basic validation)"""
-        schema = self.get_config_schema()
-        if not schema:
-            return True  # No config needed
-        
-        # Basic validation - could be enhanced with jsonschema
-        required_fields = schema.get("required", [])
-        properties = schema.get("properties", {})
-        
-        # Check required fields
-        for field in required_fields:
-            if field not in config:
-                return False
-        
-        # Check field types (basic)
-        for field, value in config.items():
-            if field in properties:
-                expected_type = properties[field].get("type")
-                if expected_type == "string" and not isinstance(value, str):
-                    return False
-                elif expected_type == "number" and not isinstance(value, (int, float)):
-                    return False
-                elif expected_type == "boolean" and not isinstance(value, bool):
-                    return False
-                elif expected_type == "array" and not isinstance(value, list):
-                    return False
-                elif expected_type == "object" and not isinstance(value, dict):
-                    return False
-        
-        return True
+        return self._compiled_config_validator()(config)
     
     async def _get_model_class(self):
         """Get the SQLAlchemy model class for this resource.
@@ -150,14 +210,10 @@ class BaseResource(ABC):
         try:
             async with self._db.get_session() as session:
                 # Check if any records exist
-                from sqlalchemy import text
-                result = await session.execute(
-                    text(f"SELECT EXISTS(SELECT 1 FROM {model_class.__tablename__} LIMIT 1)")
-                )
-                has_data = result.scalar()
-                return not has_data
+                result = await session.execute(_any_row_statement(model_class))
+                return result.first() is None
         except Exception as e:
-            logger.debug(f"Error checking if table is empty: {e}")
+            logger.debug("Error checking if table is empty: %s", e)
             return False
     
     async def _seed_data(self):
@@ -176,98 +232,145 @@ class BaseResource(ABC):
             logger.warning(f"No model class defined for resource {self.name}")
             return
             
-        # Insert data
+        keymap = _SeedKeyMap(*_model_column_map(model_class))
+        
+        # Insert data in bounded batches within one transaction, so a failure
+        # never leaves a partially seeded table (which would look already seeded)
         async with self._db.get_session() as session:
             try:
-                # Create model instances
-                instances = []
+                total = 0
+                records = []
                 for row in data:
                     # Filter out any fields that don't exist in the model and normalize case
-                    model_fields = {col.name for col in model_class.__table__.columns}
-                    filtered_row = {}
-                    
-                    for k, v in row.items():
-                        # Try exact match first, then lowercase
-                        if k in model_fields:
-                            filtered_row[k] = v
-                        elif k.lower() in model_fields:
-                            filtered_row[k.lower()] = v
-                    
-                    instance = model_class(**filtered_row)
-                    instances.append(instance)
+                    filtered_row = {keymap[k]: v for k, v in row.items() if keymap[k]}
+                    records.append(filtered_row)
+                    if len(records) >= SEED_BATCH_SIZE:
+                        total += await self._insert_seed_batch(session, model_class, records)
+                        records = []
+                
+                if records:
+                    total += await self._insert_seed_batch(session, model_class, records)
                 
-                # Bulk insert
-                session.add_all(instances)
                 await session.commit()
-                logger.info(f"Successfully seeded {len(instances)} records for resource {self.name}")
+                logger.info(f"Successfully seeded {total} records for resource {self.name}")
                 
             except Exception as e:
                 await session.rollback()
-                logger.error(f"Failed to seed data: {e}")
+                logger.error(f"Failed to seed data for resource {self.name}, rolled back: {e}")
                 raise
     
-    async def _fetch_seed_data(self) -> Optional[List[Dict[str, Any]]]:
+    async def _insert_seed_batch(self, session, model_class, records: List[Dict[str, Any]]) -> int:
+        """Insert one batch of normalized seed rows"""
+        present = set().union(*records)
+        columns = [col.name for col in model_class.__table__.columns if col.name in present]
+        
+        dialect = self._db.engine.dialect
+        if dialect.name == "postgresql" and self._can_copy(model_class, columns, dialect):
+            # Stream rows straight into COPY - no ORM instances, one round trip
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                model_class.__tablename__,
+                records=(tuple(r.get(c) for c in columns) for r in records),
+                columns=columns
+            )
+        else:
+            await session.execute(insert(model_class), records)
+        
+        return len(records)
+    
+    @staticmethod
+    def _can_copy(model_class, columns: List[str], dialect) -> bool:
+        """Check whether rows for these columns can go through COPY unchanged.
+        
+        COPY bypasses SQLAlchemy, so omitted columns must be filled by the
+        database and no column may rely on bind processing (JSON, Enum,
+        pgvector, TypeDecorators, ...) to convert its values.
+        """
+        for col in model_class.__table__.columns:
+            if col.name not in columns:
+                if col.default is not None:
+                    return False
+            elif col.type.dialect_impl(dialect).bind_processor(dialect) is not None:
+                return False
+        return True
+    
+    async def _fetch_seed_data(self) -> Optional[Iterable[Dict[str, Any]]]:
         """Fetch seed data from local file or URL"""
         if self.seed_source.startswith(('http://', 'https://')):
             return await self._fetch_from_url()
         else:
             return await self._fetch_from_file()
     
-    async def _fetch_from_file(self) -> Optional[List[Dict[str, Any]]]:
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _seed_file_path(cls) -> Path:
+        """Resolve the local seed file relative to the resource module, once per class"""
+        resource_dir = Path(cls.__module__.replace('.', '/')).parent
+        return resource_dir / cls.seed_source
+    
+    async def _fetch_from_file(self) -> Optional[Iterable[Dict[str, Any]]]:
         """Fetch seed data from local file"""
-        # Resolve path relative to resource module
-        resource_dir = Path(self.__module__.replace('.', '/')).parent
-        file_path = resource_dir / self.seed_source
+        file_path = self._seed_file_path()
         
         if not file_path.exists():
             logger.warning(f"Seed file not found: {file_path}")
             return None
             
         if file_path.suffix.lower() == '.csv':
-            return self._parse_csv(file_path.read_text())
+            return self._read_csv_file(file_path)
         elif file_path.suffix.lower() == '.json':
-            return json.loads(file_path.read_text())
+            # Read off the event loop so large files don't stall other requests
+            return from_json(await asyncio.to_thread(file_path.read_bytes))
         else:
             logger.warning(f"Unsupported seed file format: {file_path.suffix}")
             return None
     
-    async def _fetch_from_url(self) -> Optional[List[Dict[str, Any]]]:
+    async def _fetch_from_url(self) -> Optional[Iterable[Dict[str, Any]]]:
         """Fetch seed data from URL"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.seed_source) as response:
-                    if response.status != 200:
-                        logger.warning(f"Failed to fetch seed data from {self.seed_source}: {response.status}")
-                        return None
-                        
-                    content = await response.text()
+            session = await _get_http_session()
+            async with session.get(self.seed_source) as response:
+                if response.status != 200:
+                    logger.warning(f"Failed to fetch seed data from {self.seed_source}: {response.status}")
+                    return None
+                    
+                # Determine format from URL or content-type before reading the body
+                content_type = response.content_type
+                if self.seed_source.endswith('.csv') or 'csv' in content_type:
+                    body = await response.read()
+                    return self._parse_csv(io.StringIO(body.decode(response.charset or 'utf-8')))
+                elif self.seed_source.endswith('.json') or 'json' in content_type:
+                    return from_json(await response.read())
+                else:
+                    logger.warning(f"Cannot determine format for URL: {self.seed_source}")
+                    return None
                     
-                    # Determine format from URL or content-type
-                    if self.seed_source.endswith('.csv') or 'csv' in response.content_type:
-                        return self._parse_csv(content)
-                    elif self.seed_source.endswith('.json') or 'json' in response.content_type:
-                        return json.loads(content)
-                    else:
-                        logger.warning(f"Cannot determine format for URL: {self.seed_source}")
-                        return None
-                        
         except Exception as e:
             logger.error(f"Failed to fetch seed data from URL: {e}")
             return None
     
-    def _parse_csv(self, content: str) -> List[Dict[str, Any]]:
-        """Parse CSV content into list of dictionaries"""
-        rows = []
-        reader = csv.DictReader(content.strip().splitlines())
+    def _read_csv_file(self, file_path: Path) -> Iterator[Dict[str, Any]]:
+        """Stream rows from a CSV file, keeping the file open while they are consumed"""
+        with open(file_path, newline='', encoding='utf-8') as f:
+            yield from self._parse_csv(f)
+    
+    def _parse_csv(self, stream: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Parse CSV lines into dictionaries, yielding one row at a time"""
+        reader = csv.reader(stream)
+        header = next(reader, None)
+        if not header:
+            return
+        width = len(header)
+        
         for row in reader:
-            # Convert empty strings to None
-            cleaned_row = {k: (v if v != '' else None) for k, v in row.items()}
+            if not row:
+                continue
             
-            # Skip rows that have None values for required fields
+            # Skip rows with empty or missing fields
             # (This is a simple check - could be enhanced with schema validation)
-            if any(v is None for v in cleaned_row.values()):
-                logger.debug(f"Skipping CSV row with empty fields: {cleaned_row}")
+            if len(row) != width or '' in row:
+                logger.debug("Skipping CSV row with empty fields: %s", row)
                 continue
                 
-            rows.append(cleaned_row)
-        return rows
\ No newline at end of file
+            yield dict(zip(header, row))
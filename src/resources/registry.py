@@ -2,18 +2,51 @@
 Resource registry for dynamic resource discovery and management
 """
 
+import asyncio
+import functools
 import logging
 import importlib
+import inspect
 import os
+import re
+import sys
+from types import ModuleType
 from typing import Dict, List, Optional, Type, Any
-from pathlib import Path
 
-from .base import BaseResource, ResourceSchema
+from .base import BaseResource, ResourceSchema, close_http_session
 from .types import MCPResource, ResourceContent
 from ..database import DatabaseService
 
 logger = logging.getLogger(__name__)
 
+# Separators in the RESOURCES env var: commas and any surrounding whitespace
+_RESOURCES_SPLIT_RE = re.compile(r"[,\s]+")
+
+
+def _import_resource_module(module_name: str) -> ModuleType:
+    """Import a resource module, skipping the import machinery when already loaded"""
+    module = sys.modules.get(module_name)
+    return module if module is not None else importlib.import_module(module_name)
+
+
+@functools.lru_cache(maxsize=None)
+def _find_resource_class(module_name: str) -> Optional[Type[BaseResource]]:
+    """Find the BaseResource subclass defined in a module, scanning each module once"""
+    resource_module = _import_resource_module(module_name)
+    
+    # Subclasses register themselves on import via BaseResource.__init_subclass__
+    for resource_class in BaseResource._subclasses_by_module.get(module_name, ()):
+        if not inspect.isabstract(resource_class):
+            return resource_class
+    
+    # Fall back to scanning for classes re-exported from another module
+    for attr_name, attr in vars(resource_module).items():
+        if attr_name.startswith("_"):
+            continue
+        if isinstance(attr, type) and attr is not BaseResource and issubclass(attr, BaseResource):
+            return attr
+    return None
+
 
 class ResourceRegistry:
     """Registry for managing and discovering MCP resources"""
@@ -22,15 +55,22 @@ class ResourceRegistry:
         self._resources: Dict[str, BaseResource] = {}
         self._resource_classes: Dict[str, Type[BaseResource]] = {}
         self._db: Optional[DatabaseService] = None
+        # resource name -> config schema (None when the resource takes no config)
+        self._schema_cache: Dict[str, Optional[Dict[str, Any]]] = {}
+        # URI scheme -> first registered resource using it
+        self._uri_scheme_index: Dict[str, BaseResource] = {}
+        # Resources that accept a database service, collected at registration
+        self._db_aware: List[BaseResource] = []
+        # Parsed RESOURCES env var; it doesn't change while the process runs
+        self._enabled_cache: Optional[List[str]] = None
     
     def set_database(self, db: DatabaseService) -> None:
         """Set the database service and propagate to resources that need it"""
         self._db = db
         
         # Propagate database to resources that need it
-        for resource in self._resources.values():
-            if hasattr(resource, 'set_database'):
-                resource.set_database(db)
+        for resource in self._db_aware:
+            resource.set_database(db)
         
         logger.info(f"Database set for resource registry with {len(self._resources)} resources")
     
@@ -44,20 +84,50 @@ class ResourceRegistry:
         
         logger.info(f"Resource registry initialized with resources: {list(self._resources.keys())}")
     
+    async def close(self) -> None:
+        """Release shared resources held by the registry"""
+        await close_http_session()
+    
     def register_resource(self, resource_class: Type[BaseResource], custom_name: str = None) -> None:
         """Register a resource class with optional custom name for namespacing"""
+        # Re-discovery registers the same classes again; keep the existing instance
+        if custom_name and self._resource_classes.get(custom_name) is resource_class:
+            logger.debug("Resource %s already registered with this class, skipping", custom_name)
+            return
+        
         resource_instance = resource_class()
         resource_name = custom_name if custom_name else resource_instance.name
         
+        if self._resource_classes.get(resource_name) is resource_class:
+            logger.debug("Resource %s already registered with this class, skipping", resource_name)
+            return
+        
         if resource_name in self._resources:
             logger.warning(f"Resource '{resource_name}' already registered, overwriting")
         
-        # Set database if available
-        if self._db and hasattr(resource_instance, 'set_database'):
-            resource_instance.set_database(self._db)
+        # Track resources that need the database, and hand it over if already set
+        previous = self._resources.get(resource_name)
+        if previous is not None and previous in self._db_aware:
+            self._db_aware.remove(previous)
+        if callable(getattr(resource_instance, 'set_database', None)):
+            self._db_aware.append(resource_instance)
+            if self._db:
+                resource_instance.set_database(self._db)
         
         self._resources[resource_name] = resource_instance
         self._resource_classes[resource_name] = resource_class
+        self._schema_cache.pop(resource_name, None)
+        self._rebuild_uri_scheme_index()
+    
+    def _rebuild_uri_scheme_index(self) -> None:
+        """Map each URI scheme to the first resource registered for it (matches linear lookup order)"""
+        index: Dict[str, BaseResource] = {}
+        for resource in self._resources.values():
+            try:
+                index.setdefault(resource.uri_scheme, resource)
+            except Exception as e:
+                logger.debug("Resource %s has no usable uri_scheme: %s", resource, e)
+        self._uri_scheme_index = index
     
     def get_resource(self, name: str) -> Optional[BaseResource]:
         """Get a resource by name"""
@@ -65,6 +135,12 @@ class ResourceRegistry:
     
     def get_resource_by_uri(self, uri: str) -> Optional[BaseResource]:
         """Get a resource that can handle the given URI"""
+        scheme = uri.split("://", 1)[0]
+        resource = self._uri_scheme_index.get(scheme)
+        if resource is not None and resource.validate_uri(uri):
+            return resource
+        
+        # Resources may override validate_uri, so fall back to asking each one
         for resource in self._resources.values():
             if resource.validate_uri(uri):
                 return resource
@@ -72,6 +148,12 @@ class ResourceRegistry:
     
     def _get_enabled_resources(self) -> List[str]:
         """Get list of enabled resources from RESOURCES environment variable"""
+        if self._enabled_cache is None:
+            self._enabled_cache = self._parse_enabled_resources()
+        return self._enabled_cache
+    
+    def _parse_enabled_resources(self) -> List[str]:
+        """Parse the RESOURCES environment variable"""
         resources_env = os.getenv("RESOURCES", "")
         if not resources_env:
             logger.warning("No RESOURCES environment variable set, no resources will be enabled")
@@ -82,8 +164,8 @@ class ResourceRegistry:
             logger.info("RESOURCES=__all__ detected, discovering all available resources")
             return self._discover_all_available_resources()
         
-        # Split by comma and strip whitespace
-        resources = [r.strip() for r in resources_env.split(",") if r.strip()]
+        # Split by comma, dropping whitespace and empty entries
+        resources = [r for r in _RESOURCES_SPLIT_RE.split(resources_env) if r]
         logger.info(f"Enabled resources from environment: {resources}")
         return resources
 
@@ -92,64 +174,71 @@ class ResourceRegistry:
         available_resources = []
         
         # Get the resources directory path
-        resources_path = Path(resources_package.replace(".", "/"))
-        if not resources_path.exists():
+        resources_path = resources_package.replace(".", os.sep)
+        if not os.path.isdir(resources_path):
             logger.warning(f"Resources directory {resources_path} does not exist")
             return []
         
-        # First, check for simple resources in the root directory
-        for resource_dir in resources_path.iterdir():
-            if not resource_dir.is_dir() or resource_dir.name.startswith("_"):
+        # Single walk: resources live at depth 1 ("knowledge") or depth 2
+        # ("acme/product_catalog"); the directory listing tells us whether
+        # resource.py exists, so no extra stat per directory is needed
+        for root, dirs, files in os.walk(resources_path):
+            relative = os.path.relpath(root, resources_path)
+            depth = 0 if relative == os.curdir else relative.count(os.sep) + 1
+            
+            if depth and "resource.py" in files:
+                # Resource directory (simple or namespaced); don't descend further
+                resource_name = relative.replace(os.sep, "/")
+                available_resources.append(resource_name)
+                logger.debug("Found available resource: %s", resource_name)
+                dirs[:] = []
                 continue
-                
-            # Check if this is a namespace directory or a resource directory
-            resource_file = resource_dir / "resource.py"
-            if resource_file.exists():
-                # Simple resource (e.g., "knowledge")
-                available_resources.append(resource_dir.name)
-                logger.debug(f"Found available resource: {resource_dir.name}")
+            
+            if depth >= 2:
+                dirs[:] = []
             else:
-                # This might be a namespace directory, scan it
-                namespace = resource_dir.name
-                for namespaced_resource_dir in resource_dir.iterdir():
-                    if not namespaced_resource_dir.is_dir() or namespaced_resource_dir.name.startswith("_"):
-                        continue
-                        
-                    resource_name = namespaced_resource_dir.name
-                    
-                    # Check if resource.py exists
-                    resource_file = namespaced_resource_dir / "resource.py"
-                    if resource_file.exists():
-                        full_resource_name = f"{namespace}/{resource_name}"
-                        available_resources.append(full_resource_name)
-                        logger.debug(f"Found available resource: {full_resource_name}")
+                # Root or namespace directory: scan its non-private subdirectories
+                dirs[:] = [d for d in dirs if not d.startswith("_")]
         
         logger.info(f"Discovered {len(available_resources)} available resources: {available_resources}")
         return available_resources
     
     async def list_resources(self, enabled_resources: List[str] = None, resource_configs: Dict[str, Dict[str, Any]] = None) -> List[MCPResource]:
         """List available resources, optionally filtered by enabled_resources"""
-        if enabled_resources is None:
-            enabled_resources = list(self._resources.keys())
-        
         if resource_configs is None:
             resource_configs = {}
         
+        if enabled_resources is None:
+            # Snapshot the names: registration may happen while listing awaits
+            names = tuple(self._resources)
+        else:
+            names = []
+            for resource_name in enabled_resources:
+                if resource_name in self._resources:
+                    names.append(resource_name)
+                else:
+                    logger.warning(f"Enabled resource '{resource_name}' not found in registry")
+        
+        # List all resources concurrently; one failure doesn't hide the others
+        results = await asyncio.gather(
+            *(self._list_resource(self._resources[name], resource_configs.get(name, {})) for name in names),
+            return_exceptions=True
+        )
+        
         all_resources = []
-        for resource_name in enabled_resources:
-            if resource_name in self._resources:
-                resource = self._resources[resource_name]
-                config = resource_configs.get(resource_name, {})
-                try:
-                    resources = await resource.list_resources(config)
-                    all_resources.extend(resources)
-                except Exception as e:
-                    logger.error(f"Error listing resources for '{resource_name}': {e}")
+        for resource_name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error listing resources for '{resource_name}': {result}")
             else:
-                logger.warning(f"Enabled resource '{resource_name}' not found in registry")
+                all_resources.extend(result)
         
         return all_resources
     
+    async def _list_resource(self, resource: BaseResource, config: Dict[str, Any]) -> List[MCPResource]:
+        """List one resource once it has finished initializing"""
+        await resource.wait_ready()
+        return await resource.list_resources(config)
+    
     def discover_resources(self, resources_package: str = "src.resources") -> None:
         """Discover and register resources based on RESOURCES environment variable"""
         try:
@@ -167,7 +256,7 @@ class ResourceRegistry:
                     # Always register with the exact resource name (simple or namespaced)
                     self.register_resource(resource_class, custom_name=resource_name)
                     registered_count += 1
-                    logger.debug(f"Registered resource: {resource_name}")
+                    logger.debug("Registered resource: %s", resource_name)
                 else:
                     logger.warning(f"Resource '{resource_name}' not found")
             
@@ -189,22 +278,13 @@ class ResourceRegistry:
                 # Construct module path: src.resources.knowledge.resource
                 resource_module_name = f"{base_package}.{resource_name}.resource"
             
-            resource_module = importlib.import_module(resource_module_name)
-            
-            # Look for classes that inherit from BaseResource
-            for attr_name in dir(resource_module):
-                attr = getattr(resource_module, attr_name)
-                if (isinstance(attr, type) and 
-                    hasattr(attr, '__mro__') and
-                    any(base.__name__ == 'BaseResource' for base in attr.__mro__) and
-                    attr.__name__ != 'BaseResource'):
-                    return attr
-            
-            logger.warning(f"No BaseResource subclass found in {resource_module_name}")
-            return None
+            resource_class = _find_resource_class(resource_module_name)
+            if resource_class is None:
+                logger.warning(f"No BaseResource subclass found in {resource_module_name}")
+            return resource_class
                     
         except ImportError as e:
-            logger.debug(f"Could not import resource {resource_name}: {e}")
+            logger.debug("Could not import resource %s: %s", resource_name, e)
             return None
         except Exception as e:
             logger.error(f"Error discovering resource {resource_name}: {e}")
@@ -212,9 +292,6 @@ class ResourceRegistry:
     
     async def read_resource(self, uri: str, enabled_resources: List[str] = None, resource_configs: Dict[str, Dict[str, Any]] = None) -> Optional[ResourceContent]:
         """Read resource content with enabled resources filtering"""
-        if enabled_resources is None:
-            enabled_resources = list(self._resources.keys())
-        
         if resource_configs is None:
             resource_configs = {}
         
@@ -224,8 +301,8 @@ class ResourceRegistry:
             logger.warning(f"No resource found for URI: {uri}")
             return None
         
-        # Check if this resource is enabled for the client
-        if resource.name not in enabled_resources:
+        # Check if this resource is enabled for the client (None means all registered)
+        if enabled_resources is not None and resource.name not in enabled_resources:
             logger.warning(f"Resource '{resource.name}' not enabled for this client")
             return None
         
@@ -233,6 +310,7 @@ class ResourceRegistry:
         config = resource_configs.get(resource.name, {})
         
         try:
+            await resource.wait_ready()
             return await resource.read_resource(uri, config)
         except Exception as e:
             logger.error(f"Error reading resource '{resource.name}' for URI {uri}: {e}")
@@ -240,19 +318,20 @@ class ResourceRegistry:
     
     def get_resource_config_schemas(self) -> Dict[str, Optional[Dict[str, Any]]]:
         """Get configuration schemas for all registered resources"""
-        schemas = {}
-        for resource_name, resource in self._resources.items():
-            resource_class = self._resource_classes[resource_name]
-            schemas[resource_name] = resource_class.get_config_schema()
-        return schemas
+        return {resource_name: self.get_resource_config_schema(resource_name) for resource_name in self._resources}
     
     def get_resource_config_schema(self, resource_name: str) -> Optional[Dict[str, Any]]:
         """Get configuration schema for a specific resource"""
+        if resource_name in self._schema_cache:
+            return self._schema_cache[resource_name]
+        
         if resource_name not in self._resource_classes:
             return None
         
         resource_class = self._resource_classes[resource_name]
-        return resource_class.get_config_schema()
+        schema = resource_class.get_config_schema()
+        self._schema_cache[resource_name] = schema
+        return schema
 
 
 # Global registry instance
@@ -3,43 +3,60 @@ MCP Resource type definitions using Pydantic
 """
 from typing import Dict, Any, Optional
 import base64
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_serializer
 
 
 class MCPResource(BaseModel):
     """Represents an MCP resource"""
+    model_config = ConfigDict(populate_by_name=True)
+    
     uri: str
     name: str
     description: str
     mime_type: Optional[str] = Field(None, alias="mimeType")
     
-    class Config:
-        validate_by_name = True
+    # Serialized form, built on first to_dict() and reset when a field changes
+    _mcp_dict: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self._mcp_dict = None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to MCP protocol format"""
-        return self.dict(by_alias=True, exclude_none=True)
+        if self._mcp_dict is None:
+            self._mcp_dict = self.model_dump(by_alias=True, exclude_none=True)
+        # Copy so callers can't alter the cached form
+        return dict(self._mcp_dict)
 
 
 class ResourceContent(BaseModel):
     """Represents resource content for MCP responses"""
+    model_config = ConfigDict(populate_by_name=True)
+    
     uri: str
     mime_type: str = Field(alias="mimeType")
     text: Optional[str] = None
     blob: Optional[bytes] = None
     
-    class Config:
-        validate_by_name = True
+    # Serialized form, built on first to_dict() so blobs are encoded once;
+    # reset when a field changes
+    _mcp_dict: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self._mcp_dict = None
+    
+    @field_serializer("blob")
+    def _serialize_blob(self, blob: Optional[bytes]) -> Optional[str]:
+        # Base64 encode blob (output is pure ASCII)
+        return base64.b64encode(blob).decode('ascii') if blob is not None else None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to MCP protocol format"""
-        result = {
-            "uri": self.uri,
-            "mimeType": self.mime_type
-        }
-        if self.text is not None:
-            result["text"] = self.text
-        if self.blob is not None:
-            # Base64 encode blob
-            result["blob"] = base64.b64encode(self.blob).decode('utf-8')
-        return result
\ No newline at end of file
+        if self._mcp_dict is None:
+            self._mcp_dict = self.model_dump(by_alias=True, exclude_none=True)
+        # Copy so callers can't alter the cached form
+        return dict(self._mcp_dict)
@@ -1,12 +1,15 @@
 """
 MCP Server Factory - Creates and manages MCP server instances
 """
-from typing import Dict, Any, Optional
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple, Union
 from fastapi import Request, Response, BackgroundTasks
 from fastmcp import FastMCP
-import json
+from pydantic_core import from_json, to_json
+import asyncio
 import logging
+import os
 import time
+from collections import OrderedDict
 from functools import lru_cache
 
 from ..database import DatabaseService
@@ -15,445 +18,270 @@ from ..tools.registry import tool_registry
 
 logger = logging.getLogger(__name__)
 
-# Simple in-memory cache with TTL
-_config_cache = {}
+# Simple in-memory cache with TTL, bounded in size
+# (client id, config type) -> (data, expiry time); every entry gets the same TTL and is
+# re-inserted on update, so dict order is also expiry order
+_config_cache: Dict[Tuple[str, str], Tuple[Any, float]] = {}
 _cache_ttl = 300  # 5 minutes
+_cache_maxsize = 10_000
 
+# cache key -> task loading it, so concurrent misses share one DB query
+_config_loads: Dict[Tuple[str, str], asyncio.Task] = {}
 
-def _get_cached_config(client_id: str, config_type: str, db: DatabaseService):
+
+def _get_cached_config(client_id: str, config_type: str):
     """Get cached configuration with TTL"""
-    cache_key = f"{client_id}:{config_type}"
-    current_time = time.time()
+    cache_key = (client_id, config_type)
     
     # Check if we have valid cached data
-    if cache_key in _config_cache:
-        cached_data, cache_time = _config_cache[cache_key]
-        if current_time - cache_time < _cache_ttl:
-            logger.debug(f"Cache hit for {cache_key}")
+    entry = _config_cache.get(cache_key)
+    if entry is not None:
+        cached_data, expires_at = entry
+        if expires_at > time.monotonic():
+            logger.debug("Cache hit for %s", cache_key)
             return cached_data
+        del _config_cache[cache_key]
     
     # Cache miss or expired, will be filled by caller
-    logger.debug(f"Cache miss for {cache_key}")
+    logger.debug("Cache miss for %s", cache_key)
     return None
 
 def _set_cached_config(client_id: str, config_type: str, data: Any):
-    """Set cached configuration with current timestamp"""
-    cache_key = f"{client_id}:{config_type}"
-    _config_cache[cache_key] = (data, time.time())
-    logger.debug(f"Cached {config_type} config for client {client_id}")
+    """Set cached configuration, evicting expired or oldest entries when full"""
+    cache_key = (client_id, config_type)
+    now = time.monotonic()
+    
+    # Move the key to the end so the oldest entries stay at the front
+    _config_cache.pop(cache_key, None)
+    
+    # Reap expired entries from the front, then evict the oldest if still full
+    while _config_cache:
+        oldest_key = next(iter(_config_cache))
+        if _config_cache[oldest_key][1] > now and len(_config_cache) < _cache_maxsize:
+            break
+        del _config_cache[oldest_key]
+    
+    _config_cache[cache_key] = (data, now + _cache_ttl)
+    logger.debug("Cached %s config for client %s", config_type, client_id)
+
+async def _get_or_load_config(client_id: str, config_type: str, loader: Callable[[], Awaitable[Any]]):
+    """Get cached configuration, loading it once for all concurrent callers on a miss"""
+    cached_data = _get_cached_config(client_id, config_type)
+    if cached_data is not None:
+        return cached_data
+    
+    cache_key = (client_id, config_type)
+    task = _config_loads.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(_load_config(cache_key, client_id, config_type, loader))
+        _config_loads[cache_key] = task
+        task.add_done_callback(lambda done: _config_loads.pop(cache_key) if _config_loads.get(cache_key) is done else None)
+    
+    # Shield so one cancelled caller doesn't cancel the load for the others
+    return await asyncio.shield(task)
+
+async def _load_config(cache_key: Tuple[str, str], client_id: str, config_type: str, loader: Callable[[], Awaitable[Any]]):
+    """Run a config load and cache the result"""
+    data = await loader()
+    # Skip caching if the entry was cleared while loading (the data may be stale)
+    if _config_loads.get(cache_key) is asyncio.current_task():
+        _set_cached_config(client_id, config_type, data)
+    return data
 
 def clear_config_cache(client_id: str = None, config_type: str = None):
     """Clear configuration cache for a specific client/config type or all"""
-    global _config_cache
-    
     if client_id and config_type:
         # Clear specific cache entry
-        cache_key = f"{client_id}:{config_type}"
+        cache_key = (client_id, config_type)
+        _config_loads.pop(cache_key, None)
         if cache_key in _config_cache:
             del _config_cache[cache_key]
-            logger.debug(f"Cleared cache for {cache_key}")
+            logger.debug("Cleared cache for %s", cache_key)
     elif client_id:
         # Clear all cache entries for a client
-        keys_to_delete = [k for k in _config_cache.keys() if k.startswith(f"{client_id}:")]
+        keys_to_delete = [k for k in _config_cache.keys() if k[0] == client_id]
         for key in keys_to_delete:
             del _config_cache[key]
-        logger.debug(f"Cleared all cache entries for client {client_id}")
+        for key in [k for k in _config_loads if k[0] == client_id]:
+            del _config_loads[key]
+        logger.debug("Cleared all cache entries for client %s", client_id)
     else:
         # Clear entire cache
         _config_cache.clear()
+        _config_loads.clear()
         logger.debug("Cleared entire configuration cache")
 
+# Handles one JSON-RPC request; returns the response dict, or None for notifications
+_MethodHandler = Callable[[Dict[str, Any], Request, BackgroundTasks], Awaitable[Optional[Dict[str, Any]]]]
+
+# Static JSON-RPC results, shared between requests (serialized as-is, never mutated)
+_EMPTY_RESULT: Dict[str, Any] = {}
+_PROMPTS_LIST_RESULT = {"prompts": []}
+_COMPLETION_RESULT = {
+    "completion": {
+        "values": [],
+        "total": 0,
+        "hasMore": False
+    }
+}
+
+# Response headers shared by every MCP response (Starlette copies them per response)
+_DEFAULT_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization",
+    "Cache-Control": "no-cache",
+}
+_ERROR_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type, Authorization",
+}
+
+# Largest JSON-RPC request body accepted, in bytes (default 16 MiB)
+_max_body_bytes = int(os.getenv("MCP_MAX_BODY_BYTES", str(16 * 1024 * 1024)))
+
+# Static JSON-RPC error objects, shared between responses (never mutated)
+_INVALID_API_KEY_ERROR = {"code": -32603, "message": "Invalid API key"}
+_INVALID_REQUEST_ERROR = {"code": -32600, "message": "Invalid request"}
+_MISSING_URI_ERROR = {"code": -32602, "message": "Missing required parameter: uri"}
+
+# Methods that are notifications only: no work to do and nothing to send back
+_NOTIFICATION_METHODS = frozenset({"notifications/initialized"})
+
+
+def _notification_response() -> Response:
+    """Empty 200 response for notifications (fresh each time: FastAPI may attach background tasks to it)"""
+    return Response(
+        content=b"",
+        status_code=200,
+        media_type="application/json",
+        headers=_DEFAULT_HEADERS
+    )
+
+
 class MCPServerInstance:
     """Wrapper for individual MCP server instances with direct FastMCP handling"""
     
     def __init__(self, config: Dict[str, Any], db: DatabaseService):
         self.config = config
         self.db = db
-        logger.info(f"Creating MCP server instance: {config.get('name', 'default')}")
-        logger.debug(f"Server config: {config}")
+        logger.info("Creating MCP server instance: %s", config.get('name', 'default'))
+        logger.debug("Server config: %s", config)
         self.mcp = FastMCP(config.get("name", "default"))
         
-        # Initialize resource registry with database
-        resource_registry.initialize(db)
-        
-        # Discover and initialize tools
-        self._setup_tools()
-    
-    def _setup_tools(self):
-        """Setup tools based on configuration using the new modular system"""
-        # Discover all available tools (this loads them into the registry)
-        tool_registry.discover_tools()
-        logger.debug(f"Tools discovered in registry: {list(tool_registry._tools.keys())}")
+        # Server capabilities only depend on the config, so build them once;
+        # GET discovery serves the pre-serialized form directly
+        self._init_result = {
+            "protocolVersion": "2025-03-26",
+            "capabilities": {
+                "tools": {
+                    "listChanged": True
+                },
+                "resources": {
+                    "listChanged": True
+                },
+                "prompts": {
+                    "listChanged": True
+                },
+                "logging": {},
+                "experimental": {
+                    "streaming": True
+                }
+            },
+            "serverInfo": {
+                "name": config.get("name", "mcp-server"),
+                "version": "1.0.0"
+            }
+        }
+        self._capabilities_json = to_json(self._init_result)
         
-        # Tools will be filtered by enabled_tools when listing/calling them
-        enabled_tools = self.config.get("enabled_tools", [])
-        logger.info(f"Enabled tools for this server: {enabled_tools}")
-    
+        # JSON-RPC method -> handler
+        self._method_handlers: Dict[str, _MethodHandler] = {
+            "initialize": self._handle_initialize,
+            "notifications/initialized": self._handle_initialized,
+            "ping": self._handle_empty_result,
+            "resources/list": self._handle_resources_list,
+            "resources/read": self._handle_resources_read,
+            "prompts/list": self._handle_prompts_list,
+            "tools/list": self._handle_tools_list,
+            "tools/call": self._handle_tools_call,
+            "logging/setLevel": self._handle_empty_result,
+            "completion/complete": self._handle_completion,
+        }
     
     async def handle_request(self, request: Request, background_tasks: BackgroundTasks = None) -> Response:
         """
         Handle MCP request by directly using FastMCP's server capabilities
         without the ASGI wrapper (which requires lifespan management)
         """
-        logger.debug(f"Handling {request.method} request to MCP server")
-        logger.debug(f"Request headers: {dict(request.headers)}")
-        
-        # Get request body
-        body = await request.body()
-        logger.debug(f"Request body length: {len(body)}")
+        # Skip building the debug output (headers copy, etc.) unless it will be logged
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Handling %s request to MCP server", request.method)
+            logger.debug("Request headers: %s", dict(request.headers))
         
         if request.method == "GET":
             # Handle capability discovery
-            capabilities = {
-                "protocolVersion": "2025-03-26",
-                "capabilities": {
-                    "tools": {
-                        "listChanged": True
-                    },
-                    "resources": {
-                        "listChanged": True
-                    },
-                    "prompts": {
-                        "listChanged": True
-                    },
-                    "logging": {},
-                    "experimental": {
-                        "streaming": True
-                    }
-                },
-                "serverInfo": {
-                    "name": self.config.get("name", "mcp-server"),
-                    "version": "1.0.0"
-                }
-            }
-            
             return Response(
-                content=json.dumps(capabilities),
+                content=self._capabilities_json,
                 status_code=200,
                 media_type="application/json",
-                headers={
-                    "Access-Control-Allow-Origin": "*",
-                    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
-                    "Access-Control-Allow-Headers": "Content-Type, Authorization",
-                    "Cache-Control": "no-cache",
-                }
+                headers=_DEFAULT_HEADERS
             )
             
         elif request.method == "POST":
+            # Get request body, refusing oversized ones before buffering them
+            body = await self._read_body(request)
+            if body is None:
+                return Response(
+                    content=to_json({
+                        "jsonrpc": "2.0",
+                        "error": {
+                            "code": -32600,
+                            "message": "Request body too large"
+                        }
+                    }),
+                    status_code=413,
+                    media_type="application/json",
+                    headers=_ERROR_HEADERS
+                )
+            if debug:
+                logger.debug("Request body length: %d", len(body))
+            
             # Handle JSON-RPC requests
             try:
                 if body:
-                    request_data = json.loads(body.decode())
-                    method = request_data.get("method")
-                    logger.info(f"Processing MCP method: {method}")
-                    logger.debug(f"Request data: {request_data}")
-                    
-                    if method == "initialize":
-                        response = {
-                            "jsonrpc": "2.0",
-                            "id": request_data.get("id"),
-                            "result": {
-                                "protocolVersion": "2025-03-26",
-                                "capabilities": {
-                                    "tools": {
-                                        "listChanged": True
-                                    },
-                                    "resources": {
-                                        "listChanged": True
-                                    },
-                                    "prompts": {
-                                        "listChanged": True
-                                    },
-                                    "logging": {},
-                                    "experimental": {
-                                        "streaming": True
-                                    }
-                                },
-                                "serverInfo": {
-                                    "name": self.config.get("name", "mcp-server"),
-                                    "version": "1.0.0"
-                                }
-                            }
-                        }
-                    elif method == "notifications/initialized":
-                        # Handle initialized notification
-                        logger.debug("Received initialized notification")
-                        response = None  # No response needed for notifications
-                    elif method == "ping":
-                        # Handle ping requests
-                        response = {
-                            "jsonrpc": "2.0",
-                            "id": request_data.get("id"),
-                            "result": {}
-                        }
-                    elif method == "resources/list":
-                        # List available resources for this client
-                        client = await self._get_client_from_request(request)
-                        if not client:
-                            response = {
-                                "jsonrpc": "2.0",
-                                "id": request_data.get("id"),
-                                "error": {
-                                    "code": -32603,
-                                    "message": "Invalid API key"
-                                }
-                            }
-                        else:
-                            # Get configured resources for this client (with caching)
-                            resource_configs = _get_cached_config(str(client.id), "resources", self.db)
-                            if resource_configs is None:
-                                resource_configs = await self.db.get_resource_configurations(client.id)
-                                _set_cached_config(str(client.id), "resources", resource_configs)
-                            enabled_resources = list(resource_configs.keys())
-                            
-                            logger.debug(f"Listing resources for client {client.name}, enabled: {enabled_resources}")
-                            
-                            resources = await resource_registry.list_resources(enabled_resources, resource_configs)
-                            
-                            response = {
-                                "jsonrpc": "2.0",
-                                "id": request_data.get("id"),
-                                "result": {
-                                    "resources": [resource.to_dict() for resource in resources]
-                                }
-                            }
-                    elif method == "resources/read":
-                        # Read resource content
-                        params = request_data.get("params", {})
-                        uri = params.get("uri")
-                        
-                        if not uri:
-                            response = {
-                                "jsonrpc": "2.0",
-                                "id": request_data.get("id"),
-                                "error": {
-                                    "code": -32602,
-                                    "message": "Missing required parameter: uri"
-                                }
-                            }
-                        else:
-                            # Get client and their resource configurations
-                            client = await self._get_client_from_request(request)
-                            if not client:
-                                response = {
-                                    "jsonrpc": "2.0",
-                                    "id": request_data.get("id"),
-                                    "error": {
-                                        "code": -32603,
-                                        "message": "Invalid API key"
-                                    }
-                                }
-                            else:
-                                # Get resource configurations for this client (with caching)
-                                resource_configs = _get_cached_config(str(client.id), "resources", self.db)
-                                if resource_configs is None:
-                                    resource_configs = await self.db.get_resource_configurations(client.id)
-                                    _set_cached_config(str(client.id), "resources", resource_configs)
-                                enabled_resources = list(resource_configs.keys())
-                                
-                                resource_content = await resource_registry.read_resource(uri, enabled_resources, resource_configs)
-                                
-                                if resource_content:
-                                    response = {
-                                        "jsonrpc": "2.0",
-                                        "id": request_data.get("id"),
-                                        "result": {
-                                            "contents": [resource_content.to_dict()]
-                                        }
-                                    }
-                                else:
-                                    response = {
-                                        "jsonrpc": "2.0",
-                                        "id": request_data.get("id"),
-                                        "error": {
-                                            "code": -32603,
-                                            "message": f"Resource not found or not accessible: {uri}"
-                                        }
-                                    }
-                    elif method == "prompts/list":
-                        # List available prompts (empty for now)
-                        response = {
-                            "jsonrpc": "2.0",
-                            "id": request_data.get("id"),
-                            "result": {
-                                "prompts": []
-                            }
-                        }
-                    elif method == "tools/list":
-                        # List available tools for this client
-                        # Get client and their tool configurations
-                        client = await self._get_client_from_request(request)
-                        if not client:
-                            response = {
-                                "jsonrpc": "2.0",
-                                "id": request_data.get("id"),
-                                "error": {
-                                    "code": -32603,
-                                    "message": "Invalid API key"
-                                }
-                            }
-                        else:
-                            # Get configured tools for this client (with caching)
-                            tool_configs = _get_cached_config(str(client.id), "tools", self.db)
-                            if tool_configs is None:
-                                tool_configs = await self.db.get_tool_configurations(client.id)
-                                _set_cached_config(str(client.id), "tools", tool_configs)
-                            enabled_tools = list(tool_configs.keys())
-                            
-                            logger.debug(f"Listing tools for client {client.name}, enabled: {enabled_tools}")
-                            
-                            # Only show tools that are explicitly configured for this client
-                            tool_schemas = tool_registry.list_tools(enabled_tools)
-                            tools = [schema.dict(by_alias=True) for schema in tool_schemas]
-                            
-                            response = {
-                                "jsonrpc": "2.0",
-                                "id": request_data.get("id"),
-                                "result": {
-                                    "tools": tools
-                                }
-                            }
-                    elif method == "tools/call":
-                        # Handle tool calls using the new modular system
-                        params = request_data.get("params", {})
-                        tool_name = params.get("name")
-                        tool_args = params.get("arguments", {})
-                        
-                        # Get client and their tool configurations
-                        client = await self._get_client_from_request(request)
-                        if not client:
-                            response = {
-                                "jsonrpc": "2.0",
-                                "id": request_data.get("id"),
-                                "error": {
-                                    "code": -32603,
-                                    "message": "Invalid API key"
-                                }
-                            }
-                        else:
-                            # Get tool configurations for this client (with caching)
-                            tool_configs = _get_cached_config(str(client.id), "tools", self.db)
-                            if tool_configs is None:
-                                tool_configs = await self.db.get_tool_configurations(client.id)
-                                _set_cached_config(str(client.id), "tools", tool_configs)
-                            
-                            # Check if tool is explicitly configured for this client
-                            if tool_name not in tool_configs:
-                                response = {
-                                    "jsonrpc": "2.0",
-                                    "id": request_data.get("id"),
-                                    "error": {
-                                        "code": -32602,
-                                        "message": f"Tool '{tool_name}' is not configured for this client"
-                                    }
-                                }
-                            else:
-                                # Get tool-specific configuration for this client
-                                tool_config = tool_configs.get(tool_name, {})
-                                
-                                # Get API key for context
-                                api_key = request.path_params.get("token")
-                                
-                                # Create context for tool call tracking
-                                context = {
-                                    'db': self.db,
-                                    'client': client,
-                                    'api_key': api_key
-                                }
-                                
-                                # Execute tool using registry with client configuration and tracking context
-                                tool_result = await tool_registry.execute_tool(tool_name, tool_args, tool_config, context, background_tasks)
-                                
-                                if tool_result.is_error:
-                                    response = {
-                                        "jsonrpc": "2.0",
-                                        "id": request_data.get("id"),
-                                        "error": {
-                                            "code": -32603,
-                                            "message": tool_result.content[0]["text"] if tool_result.content else "Tool execution failed"
-                                        }
-                                    }
-                                else:
-                                    result_data = {"content": tool_result.content}
-                                    
-                                    # Include structuredContent if present
-                                    if hasattr(tool_result, 'structured_content') and tool_result.structured_content is not None:
-                                        result_data["structuredContent"] = tool_result.structured_content
-                                    
-                                    response = {
-                                        "jsonrpc": "2.0",
-                                        "id": request_data.get("id"),
-                                        "result": result_data
-                                    }
-                    elif method == "logging/setLevel":
-                        # Handle logging level changes
-                        response = {
-                            "jsonrpc": "2.0",
-                            "id": request_data.get("id"),
-                            "result": {}
-                        }
-                    elif method == "completion/complete":
-                        # Handle completion requests (optional)
-                        response = {
-                            "jsonrpc": "2.0",
-                            "id": request_data.get("id"),
-                            "result": {
-                                "completion": {
-                                    "values": [],
-                                    "total": 0,
-                                    "hasMore": False
-                                }
-                            }
-                        }
+                    request_data = from_json(body)
+                    if isinstance(request_data, list):
+                        response = await self._handle_batch(request_data, request, background_tasks)
+                    elif isinstance(request_data, dict) and request_data.get("method") in _NOTIFICATION_METHODS:
+                        # Notifications need no handling or response body
+                        logger.debug("Received %s notification", request_data["method"])
+                        return _notification_response()
                     else:
-                        # Unknown method
-                        response = {
-                            "jsonrpc": "2.0",
-                            "id": request_data.get("id"),
-                            "error": {
-                                "code": -32601,
-                                "message": f"Method not found: {method}"
-                            }
-                        }
+                        response = await self._dispatch(request_data, request, background_tasks)
                 else:
                     response = {
                         "jsonrpc": "2.0",
-                        "error": {
-                            "code": -32600,
-                            "message": "Invalid request"
-                        }
+                        "error": _INVALID_REQUEST_ERROR
                     }
                 
-                logger.debug(f"MCP response: {response}")
-                
                 # Handle notifications (no response needed)
                 if response is None:
-                    return Response(
-                        content="",
-                        status_code=200,
-                        media_type="application/json",
-                        headers={
-                            "Access-Control-Allow-Origin": "*",
-                            "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
-                            "Access-Control-Allow-Headers": "Content-Type, Authorization",
-                            "Cache-Control": "no-cache",
-                        }
-                    )
+                    return _notification_response()
+                
+                logger.debug("MCP response: %s", response)
                 
                 return Response(
-                    content=json.dumps(response),
+                    content=to_json(response),
                     status_code=200,
                     media_type="application/json",
-                    headers={
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
-                        "Access-Control-Allow-Headers": "Content-Type, Authorization",
-                        "Cache-Control": "no-cache",
-                    }
+                    headers=_DEFAULT_HEADERS
                 )
                 
             except Exception as e:
-                logger.error(f"Error in MCP tool handling: {e}", exc_info=True)
+                logger.error("Error in MCP tool handling: %s", e, exc_info=True)
                 error_response = {
                     "jsonrpc": "2.0",
                     "error": {
@@ -463,18 +291,299 @@ class MCPServerInstance:
                 }
                 
                 return Response(
-                    content=json.dumps(error_response),
+                    content=to_json(error_response),
                     status_code=500,
                     media_type="application/json",
-                    headers={
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
-                        "Access-Control-Allow-Headers": "Content-Type, Authorization",
-                    }
+                    headers=_ERROR_HEADERS
                 )
     
+    async def _read_body(self, request: Request) -> Optional[bytearray]:
+        """Read the request body, or return None if it exceeds the size limit"""
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > _max_body_bytes:
+            logger.warning("Rejected MCP request body of %s bytes", content_length)
+            return None
+        
+        # Content-Length may be missing or wrong, so enforce the limit while reading too
+        body = bytearray()
+        async for chunk in request.stream():
+            body += chunk
+            if len(body) > _max_body_bytes:
+                logger.warning("Rejected MCP request body over %d bytes", _max_body_bytes)
+                return None
+        return body
+    
+    async def _dispatch(self, request_data: Any, request: Request, background_tasks: BackgroundTasks) -> Optional[Dict[str, Any]]:
+        """Run a single JSON-RPC request through its method handler"""
+        if not isinstance(request_data, dict):
+            return {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": _INVALID_REQUEST_ERROR
+            }
+        
+        method = request_data.get("method")
+        logger.info("Processing MCP method: %s", method)
+        logger.debug("Request data: %s", request_data)
+        
+        handler = self._method_handlers.get(method) if isinstance(method, str) else None
+        if handler is None:
+            # Unknown method
+            return {
+                "jsonrpc": "2.0",
+                "id": request_data.get("id"),
+                "error": {
+                    "code": -32601,
+                    "message": f"Method not found: {method}"
+                }
+            }
+        return await handler(request_data, request, background_tasks)
+    
+    async def _handle_batch(self, batch: List[Any], request: Request, background_tasks: BackgroundTasks) -> Union[List[Dict[str, Any]], Dict[str, Any], None]:
+        """Run a JSON-RPC batch concurrently, sharing one client lookup across its calls"""
+        if not batch:
+            return {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": _INVALID_REQUEST_ERROR
+            }
+        
+        request.state.mcp_client = await self._get_client_from_request(request)
+        
+        results = await asyncio.gather(
+            *(self._dispatch(request_data, request, background_tasks) for request_data in batch),
+            return_exceptions=True
+        )
+        
+        responses = []
+        for request_data, result in zip(batch, results):
+            if isinstance(result, BaseException):
+                # One failing call doesn't fail the rest of the batch
+                logger.error("Error in MCP batch call: %s", result, exc_info=result)
+                result = {
+                    "jsonrpc": "2.0",
+                    "id": request_data.get("id") if isinstance(request_data, dict) else None,
+                    "error": {
+                        "code": -32603,
+                        "message": f"Internal error: {str(result)}"
+                    }
+                }
+            if result is not None:
+                responses.append(result)
+        
+        # A batch of notifications gets no response body
+        return responses or None
+    
+    async def _handle_initialize(self, request_data: Dict[str, Any], request: Request, background_tasks: BackgroundTasks) -> Optional[Dict[str, Any]]:
+        """Return server capabilities"""
+        return {
+            "jsonrpc": "2.0",
+            "id": request_data.get("id"),
+            "result": self._init_result
+        }
+    
+    async def _handle_initialized(self, request_data: Dict[str, Any], request: Request, background_tasks: BackgroundTasks) -> Optional[Dict[str, Any]]:
+        """Handle initialized notification"""
+        logger.debug("Received initialized notification")
+        return None  # No response needed for notifications
+    
+    async def _handle_empty_result(self, request_data: Dict[str, Any], request: Request, background_tasks: BackgroundTasks) -> Optional[Dict[str, Any]]:
+        """Handle ping and logging level changes (empty result)"""
+        return {
+            "jsonrpc": "2.0",
+            "id": request_data.get("id"),
+            "result": _EMPTY_RESULT
+        }
+    
+    async def _handle_resources_list(self, request_data: Dict[str, Any], request: Request, background_tasks: BackgroundTasks) -> Optional[Dict[str, Any]]:
+        """List available resources for this client"""
+        client = await self._get_client_from_request(request)
+        if not client:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_data.get("id"),
+                "error": _INVALID_API_KEY_ERROR
+            }
+        
+        # Get configured resources for this client (with caching)
+        resource_configs = await _get_or_load_config(str(client.id), "resources", lambda: self.db.get_resource_configurations(client.id))
+        enabled_resources = list(resource_configs.keys())
+        
+        logger.debug("Listing resources for client %s, enabled: %s", client.name, enabled_resources)
+        
+        resources = await resource_registry.list_resources(enabled_resources, resource_configs)
+        
+        return {
+            "jsonrpc": "2.0",
+            "id": request_data.get("id"),
+            "result": {
+                "resources": [resource.to_dict() for resource in resources]
+            }
+        }
+    
+    async def _handle_resources_read(self, request_data: Dict[str, Any], request: Request, background_tasks: BackgroundTasks) -> Optional[Dict[str, Any]]:
+        """Read resource content"""
+        params = request_data.get("params", {})
+        uri = params.get("uri")
+        
+        if not uri:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_data.get("id"),
+                "error": _MISSING_URI_ERROR
+            }
+        
+        # Get client and their resource configurations
+        client = await self._get_client_from_request(request)
+        if not client:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_data.get("id"),
+                "error": _INVALID_API_KEY_ERROR
+            }
+        
+        # Get resource configurations for this client (with caching)
+        resource_configs = await _get_or_load_config(str(client.id), "resources", lambda: self.db.get_resource_configurations(client.id))
+        enabled_resources = list(resource_configs.keys())
+        
+        resource_content = await resource_registry.read_resource(uri, enabled_resources, resource_configs)
+        
+        if not resource_content:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_data.get("id"),
+                "error": {
+                    "code": -32603,
+                    "message": f"Resource not found or not accessible: {uri}"
+                }
+            }
+        
+        return {
+            "jsonrpc": "2.0",
+            "id": request_data.get("id"),
+            "result": {
+                "contents": [resource_content.to_dict()]
+            }
+        }
+    
+    async def _handle_prompts_list(self, request_data: Dict[str, Any], request: Request, background_tasks: BackgroundTasks) -> Optional[Dict[str, Any]]:
+        """List available prompts (empty for now)"""
+        return {
+            "jsonrpc": "2.0",
+            "id": request_data.get("id"),
+            "result": _PROMPTS_LIST_RESULT
+        }
+    
+    async def _handle_tools_list(self, request_data: Dict[str, Any], request: Request, background_tasks: BackgroundTasks) -> Optional[Dict[str, Any]]:
+        """List available tools for this client"""
+        # Get client and their tool configurations
+        client = await self._get_client_from_request(request)
+        if not client:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_data.get("id"),
+                "error": _INVALID_API_KEY_ERROR
+            }
+        
+        # Get configured tools for this client (with caching)
+        tool_configs = await _get_or_load_config(str(client.id), "tools", lambda: self.db.get_tool_configurations(client.id))
+        enabled_tools = list(tool_configs.keys())
+        
+        logger.debug("Listing tools for client %s, enabled: %s", client.name, enabled_tools)
+        
+        # Only show tools that are explicitly configured for this client
+        # (the list is shared between clients with the same tools; don't mutate it)
+        tools = tool_registry.list_tool_dicts(enabled_tools)
+        
+        return {
+            "jsonrpc": "2.0",
+            "id": request_data.get("id"),
+            "result": {
+                "tools": tools
+            }
+        }
+    
+    async def _handle_tools_call(self, request_data: Dict[str, Any], request: Request, background_tasks: BackgroundTasks) -> Optional[Dict[str, Any]]:
+        """Handle tool calls using the new modular system"""
+        params = request_data.get("params", {})
+        tool_name = params.get("name")
+        tool_args = params.get("arguments", {})
+        
+        # Get client and their tool configurations
+        client = await self._get_client_from_request(request)
+        if not client:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_data.get("id"),
+                "error": _INVALID_API_KEY_ERROR
+            }
+        
+        # Get tool configurations for this client (with caching)
+        tool_configs = await _get_or_load_config(str(client.id), "tools", lambda: self.db.get_tool_configurations(client.id))
+        
+        # Check if tool is explicitly configured for this client
+        if tool_name not in tool_configs:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_data.get("id"),
+                "error": {
+                    "code": -32602,
+                    "message": f"Tool '{tool_name}' is not configured for this client"
+                }
+            }
+        
+        # Get tool-specific configuration for this client
+        tool_config = tool_configs.get(tool_name, {})
+        
+        # Get API key for context
+        api_key = request.path_params.get("token")
+        
+        # Create context for tool call tracking
+        context = {
+            'db': self.db,
+            'client': client,
+            'api_key': api_key
+        }
+        
+        # Execute tool using registry with client configuration and tracking context
+        tool_result = await tool_registry.execute_tool(tool_name, tool_args, tool_config, context, background_tasks)
+        
+        if tool_result.is_error:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_data.get("id"),
+                "error": {
+                    "code": -32603,
+                    "message": tool_result.content[0]["text"] if tool_result.content else "Tool execution failed"
+                }
+            }
+        
+        result_data = {"content": tool_result.content}
+        
+        # Include structuredContent if present
+        if hasattr(tool_result, 'structured_content') and tool_result.structured_content is not None:
+            result_data["structuredContent"] = tool_result.structured_content
+        
+        return {
+            "jsonrpc": "2.0",
+            "id": request_data.get("id"),
+            "result": result_data
+        }
+    
+    async def _handle_completion(self, request_data: Dict[str, Any], request: Request, background_tasks: BackgroundTasks) -> Optional[Dict[str, Any]]:
+        """Handle completion requests (optional)"""
+        return {
+            "jsonrpc": "2.0",
+            "id": request_data.get("id"),
+            "result": _COMPLETION_RESULT
+        }
+    
     async def _get_client_from_request(self, request: Request):
         """Extract API key from URL and lookup client"""
+        # Already resolved for this HTTP request (by the factory, or once for a whole batch)
+        if hasattr(request.state, "mcp_client"):
+            return request.state.mcp_client
+        
         # Extract API key from URL path
         api_key = request.path_params.get("token")  # Using 'token' path param for backward compatibility
         if not api_key:
@@ -485,49 +594,84 @@ class MCPServerInstance:
         return client
 
 
+# Server instances kept by the factory; the least recently used is dropped beyond this
+_max_servers = 1024
+
+
 class MCPServerFactory:
     """Factory for creating and caching MCP server instances"""
     
     def __init__(self, db: DatabaseService):
         self.db = db
-        self._servers: Dict[str, MCPServerInstance] = {}
+        # Least recently used first, bounded by _max_servers
+        self._servers: "OrderedDict[str, MCPServerInstance]" = OrderedDict()
+        
+        # Tools and resources are shared by every server instance, so set
+        # them up once here (resource initialization triggers seeding if needed)
+        tool_registry.discover_tools()
+        logger.debug("Tools discovered in registry: %s", list(tool_registry._tools))
+        resource_registry.initialize(db)
     
-    async def get_server(self, api_key: str) -> Optional[MCPServerInstance]:
-        """Get or create MCP server instance based on API key"""
+    async def get_server(self, api_key: str, request: Optional[Request] = None) -> Optional[MCPServerInstance]:
+        """Get or create MCP server instance based on API key
+        
+        When the incoming request is passed, the client found here is kept on
+        request.state so the server instance doesn't look it up again.
+        """
         # Get client by API key
         client = await self.db.get_client_by_api_key(api_key)
         if not client:
             return None
         
+        if request is not None:
+            request.state.mcp_client = client
+        
         # Use client ID as cache key
         cache_key = f"client_{client.id}"
         
-        if cache_key not in self._servers:
-            # Create legacy config format for backward compatibility
-            config = {
-                "name": client.name,
-                "client_id": client.id,
-                "version": "2.0"
-            }
-            self._servers[cache_key] = MCPServerInstance(config, self.db)
-        
-        return self._servers[cache_key]
+        # Create legacy config format for backward compatibility
+        return self._get_or_create_server(cache_key, lambda: {
+            "name": client.name,
+            "client_id": client.id,
+            "version": "2.0"
+        })
     
     async def get_server_legacy(self, config: Dict[str, Any]) -> MCPServerInstance:
         """Legacy method for backward compatibility"""
         config_key = self._get_config_key(config)
+        return self._get_or_create_server(config_key, lambda: config)
+    
+    def _get_or_create_server(self, cache_key: str, make_config: Callable[[], Dict[str, Any]]) -> MCPServerInstance:
+        """Get a cached server instance, creating it on a miss and evicting the least recently used"""
+        # No await between lookup and insert, so concurrent requests can't create duplicates
+        server = self._servers.get(cache_key)
+        if server is not None:
+            self._servers.move_to_end(cache_key)
+            return server
         
-        if config_key not in self._servers:
-            self._servers[config_key] = MCPServerInstance(config, self.db)
-        
-        return self._servers[config_key]
+        server = MCPServerInstance(make_config(), self.db)
+        self._servers[cache_key] = server
+        if len(self._servers) > _max_servers:
+            evicted_key, _ = self._servers.popitem(last=False)
+            logger.debug("Evicted MCP server instance %s", evicted_key)
+        return server
     
     def _get_config_key(self, config: Dict[str, Any]) -> str:
         """Generate a unique key for the configuration"""
-        # Create a stable key based on configuration
-        key_parts = [
+        return self._build_config_key(
             config.get("name", "default"),
-            "-".join(sorted(config.get("enabled_tools", []))),
+            tuple(config.get("enabled_tools", [])),
             str(config.get("version", "1.0"))
+        )
+    
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _build_config_key(name: str, enabled_tools: Tuple[str, ...], version: str) -> str:
+        """Build the key once per distinct configuration (sorting and joining are cached)"""
+        # Create a stable key based on configuration
+        key_parts = [
+            name,
+            "-".join(sorted(enabled_tools)),
+            version
         ]
         return ":".join(key_parts)
\ No newline at end of file
@@ -5,12 +5,13 @@ Services module
 from .firecrawl import FirecrawlService, get_firecrawl_service
 from .openrouter import get_openrouter_service
 from .embeddings import get_embeddings_service
-from .email import EmailService
+from .email import EmailService, get_email_service
 
 __all__ = [
     "FirecrawlService",
     "get_firecrawl_service", 
     "get_openrouter_service",
     "get_embeddings_service",
-    "EmailService"
+    "EmailService",
+    "get_email_service"
 ]
\ No newline at end of file
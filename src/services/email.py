@@ -2,75 +2,193 @@
 Email service with Postmark integration - reusable across the application
 """
 
+import asyncio
 import os
-from typing import Any, Dict, Optional, List, Union
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Optional, List, Tuple, Union
 from pathlib import Path
+from urllib.parse import unquote
 import aiohttp
 from postmarker.core import PostmarkClient
 
+# Largest attachment downloaded for an email (25MB)
+MAX_ATTACHMENT_BYTES = 25 * 1024 * 1024
+
+# Content-Disposition filename parameters; the RFC 5987 form (filename*=UTF-8''...) wins
+_FILENAME_EXT_RE = re.compile(r"filename\*\s*=\s*([\w-]+)'[^']*'([^;\s]+)", re.IGNORECASE)
+_FILENAME_RE = re.compile(r'filename\s*=\s*(?:"([^"]*)"|([^;\s]+))', re.IGNORECASE)
+
+# Limits for the per-service cache of downloaded attachments (revalidated by ETag)
+ATTACHMENT_CACHE_MAX_ENTRIES = 128
+ATTACHMENT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _parse_filename(content_disposition: str) -> Optional[str]:
+    """Extract the filename from a Content-Disposition header value"""
+    match = _FILENAME_EXT_RE.search(content_disposition)
+    if match:
+        charset, value = match.groups()
+        try:
+            return unquote(value, encoding=charset, errors="replace") or None
+        except LookupError:
+            # Unknown charset
+            return unquote(value, errors="replace") or None
+    
+    match = _FILENAME_RE.search(content_disposition)
+    if match:
+        return match.group(1) or match.group(2) or None
+    
+    return None
+
 
 class EmailService:
     """Email service with Postmark integration"""
     
-    def __init__(self):
+    def __init__(self, max_concurrent_attachments: int = 8):
         self.postmark_token = os.getenv("POSTMARK_API_TOKEN")
         self.is_development = os.getenv("DEVELOPMENT", "false").lower() == "true"
+        # Pooled HTTP session for attachment downloads, created on first use
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Attachments downloaded in parallel per email
+        self.max_concurrent_attachments = max_concurrent_attachments
+        # Postmark client (and its pooled requests session), created on first send
+        self._postmark: Optional[PostmarkClient] = None
+        # URL -> (ETag, attachment), least recently used first
+        self._attachment_cache: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+        self._attachment_cache_bytes = 0
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session so downloads reuse keep-alive connections"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, limit_per_host=8, ttl_dns_cache=300, keepalive_timeout=60)
+            )
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the shared HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def __aenter__(self) -> "EmailService":
+        await self._get_session()
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
     
     async def _download_attachment(self, url: str) -> Optional[Dict[str, Any]]:
         """Download attachment from URL and return attachment data"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        return None
-                    
-                    # Check content length (25MB limit)
-                    content_length = response.headers.get("Content-Length")
-                    if content_length and int(content_length) > 25 * 1024 * 1024:
-                        return None
-                    
-                    content = await response.read()
-                    
-                    # Double check size after download
-                    if len(content) > 25 * 1024 * 1024:
+            session = await self._get_session()
+            
+            # Revalidate a cached copy; a 304 skips the body transfer
+            cached = self._attachment_cache.get(url)
+            headers = {"If-None-Match": cached[0]} if cached else None
+            
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and cached:
+                    self._attachment_cache.move_to_end(url)
+                    return dict(cached[1])
+                
+                if response.status != 200:
+                    return None
+                
+                # Check content length (25MB limit)
+                content_length = response.headers.get("Content-Length")
+                if content_length and content_length.isdigit() and int(content_length) > MAX_ATTACHMENT_BYTES:
+                    return None
+                
+                # Read in chunks and stop as soon as the limit is passed, since
+                # Content-Length may be missing or wrong
+                buffer = bytearray()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    buffer.extend(chunk)
+                    if len(buffer) > MAX_ATTACHMENT_BYTES:
                         return None
-                    
-                    # Get filename from URL or content-disposition
-                    filename = None
-                    if "Content-Disposition" in response.headers:
-                        cd = response.headers["Content-Disposition"]
-                        if "filename=" in cd:
-                            filename = cd.split("filename=")[1].strip('"')
-                    
-                    if not filename:
-                        filename = Path(url).name or "attachment"
-                    
-                    return {
-                        "Name": filename,
-                        "Content": content,
-                        "ContentType": response.headers.get("Content-Type", "application/octet-stream")
-                    }
+                content = bytes(buffer)
+                
+                # Get filename from URL or content-disposition
+                filename = _parse_filename(response.headers.get("Content-Disposition", ""))
+                
+                if not filename:
+                    filename = Path(url).name or "attachment"
+                
+                attachment = {
+                    "Name": filename,
+                    "Content": content,
+                    "ContentType": response.headers.get("Content-Type", "application/octet-stream")
+                }
+                
+                etag = response.headers.get("ETag")
+                if etag:
+                    self._cache_attachment(url, etag, attachment)
+                
+                return attachment
         except Exception:
             return None
     
+    def _cache_attachment(self, url: str, etag: str, attachment: Dict[str, Any]) -> None:
+        """Store a downloaded attachment, evicting least recently used entries past the limits"""
+        size = len(attachment["Content"])
+        if size > ATTACHMENT_CACHE_MAX_BYTES:
+            return
+        
+        previous = self._attachment_cache.pop(url, None)
+        if previous:
+            self._attachment_cache_bytes -= len(previous[1]["Content"])
+        
+        self._attachment_cache[url] = (etag, dict(attachment))
+        self._attachment_cache_bytes += size
+        
+        while (len(self._attachment_cache) > ATTACHMENT_CACHE_MAX_ENTRIES
+               or self._attachment_cache_bytes > ATTACHMENT_CACHE_MAX_BYTES):
+            _, (_, evicted) = self._attachment_cache.popitem(last=False)
+            self._attachment_cache_bytes -= len(evicted["Content"])
+    
+    async def _download_attachments(self, urls: List[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Download attachments concurrently; returns (attachments, first failed URL or None)"""
+        semaphore = asyncio.Semaphore(self.max_concurrent_attachments)
+        
+        async def download(url: str) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self._download_attachment(url)
+        
+        tasks = [asyncio.create_task(download(url)) for url in urls]
+        try:
+            # Check in order so the reported failure matches the attachment order
+            for url, task in zip(urls, tasks):
+                if await task is None:
+                    return [], url
+            return [task.result() for task in tasks], None
+        finally:
+            # Stop the remaining downloads after a failure (no-op for finished tasks)
+            for task in tasks:
+                task.cancel()
+    
     def _format_email_list(self, emails: Union[str, List[str]]) -> str:
         """Format email list for display"""
         if isinstance(emails, list):
+            if len(emails) == 1:
+                return emails[0]
             return ", ".join(emails)
         return emails
     
-    def _log_development_email(self, email_data: Dict[str, Any], attachment_urls: List[str] = None) -> str:
+    def _log_development_email(
+        self,
+        email_data: Dict[str, Any],
+        recipient_lines: List[str],
+        attachment_urls: List[str] = None
+    ) -> str:
         """Log email to console in development mode"""
         print("\n" + "="*60)
         print("📧 EMAIL LOGGED (Development Mode)")
         print("="*60)
         print(f"From: {email_data.get('From')}")
-        print(f"To: {self._format_email_list(email_data.get('To'))}")
-        
-        if email_data.get('Cc'):
-            print(f"CC: {self._format_email_list(email_data.get('Cc'))}")
-        if email_data.get('Bcc'):
-            print(f"BCC: {self._format_email_list(email_data.get('Bcc'))}")
+        for line in recipient_lines:
+            print(line)
         
         print(f"Subject: {email_data.get('Subject')}")
         print(f"Body: {email_data.get('HtmlBody', email_data.get('TextBody', ''))}")
@@ -83,20 +201,17 @@ class EmailService:
         print("="*60)
         
         # Return formatted result
-        result_text = f"""Email logged to console (Development Mode)
-From: {email_data.get('From')}
-To: {self._format_email_list(email_data.get('To'))}"""
+        parts = [
+            "Email logged to console (Development Mode)",
+            f"From: {email_data.get('From')}",
+            *recipient_lines
+        ]
         
-        if email_data.get('Cc'):
-            result_text += f"\nCC: {self._format_email_list(email_data.get('Cc'))}"
-        if email_data.get('Bcc'):
-            result_text += f"\nBCC: {self._format_email_list(email_data.get('Bcc'))}"
-        
-        result_text += f"\nSubject: {email_data.get('Subject')}"
+        parts.append(f"Subject: {email_data.get('Subject')}")
         if attachment_urls:
-            result_text += f"\nAttachments: {len(attachment_urls)} URL(s)"
+            parts.append(f"Attachments: {len(attachment_urls)} URL(s)")
         
-        return result_text
+        return "\n".join(parts)
     
     async def send_email(
         self,
@@ -147,9 +262,16 @@ To: {self._format_email_list(email_data.get('To'))}"""
         if bcc:
             email_data["Bcc"] = bcc
         
+        # Format recipient lists once for the log and result messages
+        recipient_lines = [f"To: {self._format_email_list(to)}"]
+        if cc:
+            recipient_lines.append(f"CC: {self._format_email_list(cc)}")
+        if bcc:
+            recipient_lines.append(f"BCC: {self._format_email_list(bcc)}")
+        
         # Handle development mode
         if self.is_development:
-            log_message = self._log_development_email(email_data, attachment_urls or [])
+            log_message = self._log_development_email(email_data, recipient_lines, attachment_urls or [])
             return {
                 "success": True,
                 "message": log_message,
@@ -164,46 +286,42 @@ To: {self._format_email_list(email_data.get('To'))}"""
             }
         
         try:
-            # Initialize Postmark client
-            postmark = PostmarkClient(server_token=self.postmark_token)
+            # Initialize Postmark client once so its HTTP connections are reused
+            if self._postmark is None:
+                self._postmark = PostmarkClient(server_token=self.postmark_token)
             
             # Download and attach files if provided
             attachments = []
             if attachment_urls:
-                for url in attachment_urls:
-                    attachment = await self._download_attachment(url)
-                    if attachment:
-                        attachments.append(attachment)
-                    else:
-                        return {
-                            "success": False,
-                            "error": f"Failed to download attachment from {url} (check URL and size < 25MB)"
-                        }
+                attachments, failed_url = await self._download_attachments(attachment_urls)
+                if failed_url:
+                    return {
+                        "success": False,
+                        "error": f"Failed to download attachment from {failed_url} (check URL and size < 25MB)"
+                    }
                 
                 if attachments:
                     email_data["Attachments"] = attachments
             
-            # Send email
-            response = postmark.emails.send(**email_data)
+            # Send email (postmarker is synchronous, so keep it off the event loop)
+            response = await asyncio.to_thread(self._postmark.emails.send, **email_data)
             
             # Format success message
-            result_message = f"""Email sent successfully via Postmark!
-From: {email_data['From']}
-To: {self._format_email_list(to)}"""
-            
-            if cc:
-                result_message += f"\nCC: {self._format_email_list(cc)}"
-            if bcc:
-                result_message += f"\nBCC: {self._format_email_list(bcc)}"
+            parts = [
+                "Email sent successfully via Postmark!",
+                f"From: {email_data['From']}",
+                *recipient_lines
+            ]
             
-            result_message += f"\nSubject: {subject}\nMessage ID: {response.get('MessageID', 'N/A')}"
+            parts.append(f"Subject: {subject}")
+            parts.append(f"Message ID: {response.get('MessageID', 'N/A')}")
             
             if attachments:
-                result_message += f"\nAttachments: {len(attachments)} file(s)"
+                parts.append(f"Attachments: {len(attachments)} file(s)")
             
             return {
                 "success": True,
-                "message": result_message,
+                "message": "\n".join(parts),
                 "message_id": response.get('MessageID'),
                 "response": response
             }
@@ -212,4 +330,26 @@ To: {self._format_email_list(to)}"""
             return {
                 "success": False,
                 "error": f"Failed to send email: {str(e)}"
-            }
\ No newline at end of file
+            }
+
+
+# Global service instance
+_email_service: Optional[EmailService] = None
+
+def get_email_service() -> EmailService:
+    """Get global email service instance (shares one connection pool across tools)"""
+    global _email_service
+    
+    if _email_service is None:
+        _email_service = EmailService()
+    
+    return _email_service
+
+
+async def close_email_service() -> None:
+    """Close the global email service if it was created (called on application shutdown)"""
+    global _email_service
+    
+    if _email_service is not None:
+        await _email_service.close()
+        _email_service = None
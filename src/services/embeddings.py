@@ -2,44 +2,166 @@
 Cloudflare AI embeddings service
 """
 
+import asyncio
+import hashlib
 import os
-from typing import List, Optional
-from openai import OpenAI
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+import httpx
+from openai import AsyncOpenAI
 
 DEFAULT_MODEL = "@cf/baai/bge-m3"
 
+# Largest combined input (UTF-8 bytes) sent in one coalesced embeddings request
+MAX_BATCH_BYTES = 512 * 1024
+
+# Number of embeddings kept in the in-memory cache
+EMBEDDING_CACHE_MAX_ENTRIES = 10_000
+
 
 class EmbeddingsService:
     """Service for generating embeddings using Cloudflare AI"""
     
-    def __init__(self, api_key: Optional[str] = None, account_id: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        account_id: Optional[str] = None,
+        max_batch: int = 96,
+        max_wait: float = 0.005
+    ):
         self.api_key = api_key or os.getenv("CLOUDFLARE_API_KEY")
         self.account_id = account_id or os.getenv("CLOUDFLARE_ACCOUNT_ID")
         
         if not self.api_key or not self.account_id:
             raise ValueError("CLOUDFLARE_API_KEY and CLOUDFLARE_ACCOUNT_ID environment variables are required")
         
-        self.client = OpenAI(
+        # One pooled HTTP client so concurrent batches reuse keep-alive connections
+        self.client = AsyncOpenAI(
             api_key=self.api_key,
-            base_url=f"https://api.cloudflare.com/client/v4/accounts/{self.account_id}/ai/v1"
+            base_url=f"https://api.cloudflare.com/client/v4/accounts/{self.account_id}/ai/v1",
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=16, max_connections=64)
+            )
         )
+        
+        # Concurrent create_embedding calls arriving within max_wait seconds are
+        # coalesced into one request of up to max_batch texts
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_task: Optional[asyncio.Task] = None
+        self._request_tasks: Set[asyncio.Task] = set()
+        # Hash of (model, text) -> embedding, least recently used first
+        self._embedding_cache: "OrderedDict[bytes, List[float]]" = OrderedDict()
     
     async def create_embedding(self, text: str, model: str = DEFAULT_MODEL) -> Optional[List[float]]:
-        """Create embedding for a single text string."""
-        try:
-            response = self.client.embeddings.create(
-                model=model,
-                input=text
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            print(f"Embeddings creation error: {e}")
+        """Create embedding for a single text string (batched with concurrent calls)."""
+        if text is None:
             return None
+        
+        # The normalized text is both the cache key and what gets embedded
+        text = text.strip()
+        key = hashlib.blake2b(f"{model}\0{text}".encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        cached = self._embedding_cache.get(key)
+        if cached is not None:
+            self._embedding_cache.move_to_end(key)
+            return cached
+        
+        if self._batch_task is None or self._batch_task.done():
+            self._queue = asyncio.Queue()
+            self._batch_task = asyncio.create_task(self._batch_loop())
+        
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, model, future))
+        embedding = await future
+        
+        if embedding is not None:
+            self._embedding_cache[key] = embedding
+            if len(self._embedding_cache) > EMBEDDING_CACHE_MAX_ENTRIES:
+                self._embedding_cache.popitem(last=False)
+        return embedding
+    
+    async def _batch_loop(self) -> None:
+        """Collect queued texts into batches and send one request per model"""
+        carry = None
+        while True:
+            item = carry or await self._queue.get()
+            carry = None
+            batch = [item]
+            try:
+                # Give concurrent callers a moment to join the batch
+                if self._queue.qsize() < self.max_batch - 1:
+                    await asyncio.sleep(self.max_wait)
+                
+                batch_bytes = len(item[0].encode())
+                while len(batch) < self.max_batch and not self._queue.empty():
+                    item = self._queue.get_nowait()
+                    batch.append(item)
+                    item_bytes = len(item[0].encode())
+                    if batch_bytes + item_bytes > MAX_BATCH_BYTES:
+                        carry = batch.pop()
+                        break
+                    batch_bytes += item_bytes
+                
+                by_model: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+                for text, model, future in batch:
+                    by_model.setdefault(model, []).append((text, future))
+                
+                # Send without blocking collection of the next batch
+                for model, items in by_model.items():
+                    task = asyncio.create_task(self._send_batch(model, items))
+                    self._request_tasks.add(task)
+                    task.add_done_callback(self._request_tasks.discard)
+            except asyncio.CancelledError:
+                self._resolve_pending(batch + ([carry] if carry else []))
+                raise
+            except Exception as e:
+                print(f"Embeddings batching error: {e}")
+                self._resolve_pending(batch + ([carry] if carry else []))
+                carry = None
+    
+    async def _send_batch(self, model: str, items: List[Tuple[str, asyncio.Future]]) -> None:
+        """Embed a batch of texts and resolve each caller's future"""
+        embeddings = None
+        try:
+            embeddings = await self.create_embeddings([text for text, _ in items], model)
+        finally:
+            if embeddings is None or len(embeddings) != len(items):
+                embeddings = [None] * len(items)
+            
+            for (_, future), embedding in zip(items, embeddings):
+                if not future.done():
+                    future.set_result(embedding)
+    
+    @staticmethod
+    def _resolve_pending(items: List[Tuple[str, str, asyncio.Future]]) -> None:
+        """Resolve queued callers that will not be sent with None"""
+        for _, _, future in items:
+            if not future.done():
+                future.set_result(None)
+    
+    async def close(self) -> None:
+        """Stop the batching task, resolve queued callers and close the HTTP client"""
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+            try:
+                await self._batch_task
+            except asyncio.CancelledError:
+                pass
+            self._batch_task = None
+        
+        if self._queue is not None:
+            pending = []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            self._resolve_pending(pending)
+        
+        await self.client.close()
     
     async def create_embeddings(self, texts: List[str], model: str = DEFAULT_MODEL) -> Optional[List[List[float]]]:
         """Create embeddings for multiple text strings."""
         try:
-            response = self.client.embeddings.create(
+            response = await self.client.embeddings.create(
                 model=model,
                 input=texts
             )
@@ -63,4 +185,13 @@ def get_embeddings_service() -> Optional[EmbeddingsService]:
             # API keys not available
             return None
     
-    return _embeddings_service
\ No newline at end of file
+    return _embeddings_service
+
+
+async def close_embeddings_service() -> None:
+    """Close the global embeddings service if it was created (called on application shutdown)"""
+    global _embeddings_service
+    
+    if _embeddings_service is not None:
+        await _embeddings_service.close()
+        _embeddings_service = None
@@ -11,6 +11,13 @@ try:
 except ImportError:
     FIRECRAWL_AVAILABLE = False
 
+# Content fields copied from scrape results and crawled pages when present
+_SCRAPE_FIELDS = ("markdown", "html", "rawHtml", "links", "screenshot", "metadata", "extract")
+_SCRAPE_FIELD_SET = frozenset(_SCRAPE_FIELDS)
+
+# Marks a field missing from a scrape result (None is a valid value)
+_MISSING = object()
+
 
 class FirecrawlService:
     """Service for interacting with Firecrawl API"""
@@ -67,20 +74,10 @@ class FirecrawlService:
         }
         
         # Add available data
-        if hasattr(result, 'markdown'):
-            response_data["markdown"] = result.markdown
-        if hasattr(result, 'html'):
-            response_data["html"] = result.html
-        if hasattr(result, 'rawHtml'):
-            response_data["rawHtml"] = result.rawHtml
-        if hasattr(result, 'links'):
-            response_data["links"] = result.links
-        if hasattr(result, 'screenshot'):
-            response_data["screenshot"] = result.screenshot
-        if hasattr(result, 'metadata'):
-            response_data["metadata"] = result.metadata
-        if hasattr(result, 'extract'):
-            response_data["extract"] = result.extract
+        for field in _SCRAPE_FIELDS:
+            value = getattr(result, field, _MISSING)
+            if value is not _MISSING:
+                response_data[field] = value
         
         return response_data
     
@@ -245,21 +242,8 @@ class FirecrawlService:
             page_data = {"url": page.get("url", "")}
             
             # Add available data for each page
-            if "markdown" in page:
-                page_data["markdown"] = page["markdown"]
-            if "html" in page:
-                page_data["html"] = page["html"]
-            if "rawHtml" in page:
-                page_data["rawHtml"] = page["rawHtml"]
-            if "links" in page:
-                page_data["links"] = page["links"]
-            if "screenshot" in page:
-                page_data["screenshot"] = page["screenshot"]
-            if "metadata" in page:
-                page_data["metadata"] = page["metadata"]
-            if "extract" in page:
-                page_data["extract"] = page["extract"]
-                
+            page_data.update({field: page[field] for field in page.keys() & _SCRAPE_FIELD_SET})
+            
             pages.append(page_data)
         
         return {
@@ -3,15 +3,66 @@ OpenRouter service for LLM API calls with structured output support
 """
 
 import os
+import re
 import json
-from typing import Any, Dict, List, Optional, Type, TypeVar
-from openai import OpenAI
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Type, TypeVar
+from openai import AsyncOpenAI, APIStatusError
 from pydantic import BaseModel
 
 DEFAULT_MODEL = "google/gemma-3-27b-it"
 
 T = TypeVar('T', bound=BaseModel)
 
+# Markdown code fence wrapped around a JSON response (```json ... ```)
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+# API errors that mean the model/provider can't do native structured output
+_RESPONSE_FORMAT_ERROR_RE = re.compile(r"response_format|json_schema|structured output|requested parameters", re.IGNORECASE)
+
+
+@lru_cache(maxsize=128)
+def _json_schema(response_model: Type[BaseModel]) -> Dict[str, Any]:
+    """JSON schema for a response model (cached per model)"""
+    return response_model.model_json_schema()
+
+
+def _is_strict_compatible(node: Any) -> bool:
+    """Check strict-mode rules: every object closes additionalProperties and requires all its properties"""
+    if isinstance(node, dict):
+        properties = node.get("properties")
+        if isinstance(properties, dict) and (
+            node.get("additionalProperties") is not False
+            or set(node.get("required", [])) != set(properties)
+        ):
+            return False
+        return all(_is_strict_compatible(value) for value in node.values())
+    if isinstance(node, list):
+        return all(_is_strict_compatible(value) for value in node)
+    return True
+
+
+@lru_cache(maxsize=128)
+def _response_format(response_model: Type[BaseModel]) -> Dict[str, Any]:
+    """Native structured output request parameter for a response model"""
+    schema = _json_schema(response_model)
+    json_schema = {"name": response_model.__name__, "schema": schema}
+    # Strict providers reject schemas that don't follow strict-mode rules
+    if _is_strict_compatible(schema):
+        json_schema["strict"] = True
+    return {"type": "json_schema", "json_schema": json_schema}
+
+
+@lru_cache(maxsize=128)
+def _schema_prompt(response_model: Type[BaseModel]) -> str:
+    """Build the JSON schema instruction for a response model (cached per model)"""
+    schema = json.dumps(_json_schema(response_model), separators=(",", ":"))
+    return (
+        "Please respond with a valid JSON object that matches this exact schema:\n"
+        f"{schema}\n\n"
+        "Respond ONLY with the JSON object, no additional text or formatting."
+    )
+
 
 class OpenRouterService:
     """Service for making LLM calls through OpenRouter API"""
@@ -21,10 +72,14 @@ class OpenRouterService:
         if not self.api_key:
             raise ValueError("OPENROUTER_API_KEY environment variable is required")
         
-        self.client = OpenAI(
+        self.client = AsyncOpenAI(
             base_url="https://openrouter.ai/api/v1",
             api_key=self.api_key
         )
+        
+        # Models that rejected response_format=json_schema; these go straight
+        # to the schema-in-prompt path
+        self._json_schema_unsupported: Set[str] = set()
     
     async def completion(
         self, 
@@ -35,7 +90,7 @@ class OpenRouterService:
     ) -> Optional[str]:
         """Simple text completion"""
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=temperature,
@@ -56,55 +111,64 @@ class OpenRouterService:
     ) -> Optional[T]:
         """Structured completion with Pydantic model validation"""
         try:
-            # Add JSON schema instruction to the last message
-            schema = response_model.model_json_schema()
-            schema_instruction = f"""
-Please respond with a valid JSON object that matches this exact schema:
-{json.dumps(schema, indent=2)}
-
-Respond ONLY with the JSON object, no additional text or formatting.
-"""
+            # Prefer provider-side constrained decoding
+            if messages and model not in self._json_schema_unsupported:
+                try:
+                    response = await self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        response_format=_response_format(response_model),
+                        # Route only to providers that honour response_format
+                        extra_body={"provider": {"require_parameters": True}}
+                    )
+                except APIStatusError as e:
+                    # Other API errors (context length, auth, ...) would fail the prompt path too
+                    if e.status_code >= 500 or not _RESPONSE_FORMAT_ERROR_RE.search(str(e)):
+                        raise
+                    print(f"OpenRouter json_schema output not supported for {model}, using prompt schema: {e}")
+                    self._json_schema_unsupported.add(model)
+                else:
+                    return self._parse_structured_response(response, response_model)
             
-            # Clone messages and add schema instruction
-            enhanced_messages = messages.copy()
-            if enhanced_messages:
-                enhanced_messages[-1]["content"] += "\n\n" + schema_instruction
+            # Send the schema instruction as a system message so the caller's
+            # messages are left untouched
+            schema_instruction = _schema_prompt(response_model)
+            if messages:
+                enhanced_messages = [{"role": "system", "content": schema_instruction}, *messages]
             else:
-                enhanced_messages.append({"role": "user", "content": schema_instruction})
+                enhanced_messages = [{"role": "user", "content": schema_instruction}]
             
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=model,
                 messages=enhanced_messages,
                 temperature=temperature,
                 max_tokens=max_tokens
             )
-            
-            content = response.choices[0].message.content
-            if not content:
-                return None
-            
-            # Try to parse JSON and validate with Pydantic model
-            try:
-                # Clean up response (remove markdown formatting if present)
-                content = content.strip()
-                if content.startswith("```json"):
-                    content = content[7:]
-                if content.endswith("```"):
-                    content = content[:-3]
-                content = content.strip()
-                
-                # Parse JSON and validate
-                data = json.loads(content)
-
-                return response_model.model_validate(data)
-            except (json.JSONDecodeError, ValueError) as parse_error:
-                print(f"Failed to parse structured response: {parse_error}")
-                print(f"Raw response: {content}")
-                return None
+            return self._parse_structured_response(response, response_model)
                 
         except Exception as e:
             print(f"OpenRouter structured completion error: {e}")
             return None
+    
+    def _parse_structured_response(self, response: Any, response_model: Type[T]) -> Optional[T]:
+        """Parse a completion's JSON content and validate it with the Pydantic model"""
+        content = response.choices[0].message.content
+        if not content:
+            return None
+        
+        # Try to parse JSON and validate with Pydantic model
+        try:
+            # Clean up response (remove markdown formatting if present)
+            content = _FENCE_RE.sub("", content)
+            
+            # Parse JSON and validate in one pass
+            return response_model.model_validate_json(content)
+        except (json.JSONDecodeError, ValueError) as parse_error:
+            print(f"Failed to parse structured response: {parse_error}")
+            print(f"Raw response: {content}")
+            return None
 
 
 # Global service instance
@@ -2,15 +2,27 @@
 Base classes for modular MCP tools using Pydantic
 """
 
+import functools
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 from .types import ToolSchema, ToolResult
+from ..utils.schema_validation import compile_schema_validator
 
 
 class BaseTool(ABC):
     """Abstract base class for all MCP tools"""
     
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Memoize the input schema so get_schema/validate_arguments don't
+        # rebuild the subclass's dict literal on every access
+        schema_property = cls.__dict__.get("input_schema")
+        if isinstance(schema_property, property) and schema_property.fget is not None:
+            cached_schema = functools.cached_property(schema_property.fget)
+            cached_schema.__set_name__(cls, "input_schema")
+            cls.input_schema = cached_schema
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -52,30 +64,11 @@ class BaseTool(ABC):
             inputSchema=self.input_schema
         )
     
+    @functools.cached_property
+    def _argument_validator(self) -> Callable[[Dict[str, Any]], bool]:
+        """Compile the input schema once per tool instance"""
+        return compile_schema_validator(self.input_schema)
+    
     def validate_arguments(self, arguments: Dict[str, Any]) -> bool:
         """Validate arguments against the input schema (basic validation)"""
-        # This could be enhanced with jsonschema validation
-        required_fields = self.input_schema.get("required", [])
-        properties = self.input_schema.get("properties", {})
-        
-        # Check required fields
-        for field in required_fields:
-            if field not in arguments:
-                return False
-        
-        # Check field types (basic)
-        for field, value in arguments.items():
-            if field in properties:
-                expected_type = properties[field].get("type")
-                if expected_type == "string" and not isinstance(value, str):
-                    return False
-                elif expected_type == "number" and not isinstance(value, (int, float)):
-                    return False
-                elif expected_type == "boolean" and not isinstance(value, bool):
-                    return False
-                elif expected_type == "array" and not isinstance(value, list):
-                    return False
-                elif expected_type == "object" and not isinstance(value, dict):
-                    return False
-        
-        return True
\ No newline at end of file
+        return self._argument_validator(arguments)
@@ -4,7 +4,7 @@ Send Email tool implementation - requires per-client configuration
 
 from typing import Any, Dict, Optional
 from src.tools.base import BaseTool, ToolResult
-from src.services.email import EmailService
+from src.services.email import get_email_service
 
 
 class SendEmailTool(BaseTool):
@@ -12,7 +12,7 @@ class SendEmailTool(BaseTool):
     
     def __init__(self):
         super().__init__()
-        self.email_service = EmailService()
+        self.email_service = get_email_service()
     
     @property
     def name(self) -> str:
@@ -151,6 +151,7 @@ class YouTubeLookupTool(BaseTool):
                         video_id,
                         title,
                         start_timestamp,
+                        youtube_url,
                         text,
                         1 - (embedding <=> :embedding) as vector_score,
                         ts_rank(to_tsvector('english', text || ' ' || title), plainto_tsquery('english', :original_query)) as keyword_score,
@@ -183,6 +184,7 @@ class YouTubeLookupTool(BaseTool):
                         video_id,
                         title,
                         start_timestamp,
+                        youtube_url,
                         text,
                         1 - (embedding <=> :embedding) as vector_score,
                         0.0 as keyword_score,
@@ -191,7 +193,8 @@ class YouTubeLookupTool(BaseTool):
                     WHERE embedding IS NOT NULL 
                       AND project_slug = :project_slug
                       AND (1 - (embedding <=> :embedding)) >= :min_similarity
-                    ORDER BY combined_score DESC
+                    -- Ordering on the raw distance lets the HNSW index serve the query
+                    ORDER BY embedding <=> CAST(:embedding AS halfvec(1024))
                     LIMIT :max_results
                 """)
                 
@@ -232,7 +235,7 @@ class YouTubeLookupTool(BaseTool):
                     "vector_score": float(row.vector_score),
                     "keyword_score": float(row.keyword_score),
                     "combined_score": float(row.combined_score),
-                    "youtube_url": f"https://www.youtube.com/watch?v={row.video_id}&t={int(row.start_timestamp)}s",
+                    "youtube_url": row.youtube_url,
                     "text": row.text,
                     "start_timestamp": row.start_timestamp  # Also include raw timestamp for debugging
                 }
@@ -5,14 +5,20 @@ Tool registry for dynamic tool discovery and management
 import logging
 import importlib
 import os
-from typing import Dict, List, Optional, Type, Any
+from typing import Dict, List, Optional, Tuple, Type, Any
 from pathlib import Path
 
+from pydantic import TypeAdapter
+
 from .base import BaseTool, ToolSchema, ToolResult
 from .execution_queue import SimpleToolQueue
+from .tool_call_buffer import ToolCallBuffer
 
 logger = logging.getLogger(__name__)
 
+# Dumps a whole tools/list in one pydantic-core call
+_TOOL_SCHEMA_LIST = TypeAdapter(List[ToolSchema])
+
 
 class ToolRegistry:
     """Registry for managing and discovering MCP tools"""
@@ -20,12 +26,21 @@ class ToolRegistry:
     def __init__(self):
         self._tools: Dict[str, BaseTool] = {}
         self._tool_classes: Dict[str, Type[BaseTool]] = {}
+        # Discovery depends only on the TOOLS env var, so it runs once per process
+        self._discovered = False
+        # Enabled tool names -> serialized tools/list entries (cleared on registration)
+        self._tool_list_cache: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
         # Add simple queue
         self._queue = SimpleToolQueue(
             max_workers=int(os.getenv("TOOL_MAX_WORKERS", "20")),
             queue_size=int(os.getenv("TOOL_QUEUE_SIZE", "200"))
         )
         self._queue_started = False
+        # Buffer tool call tracking records for batched inserts
+        self._call_buffer = ToolCallBuffer(
+            batch_size=int(os.getenv("TOOL_CALL_LOG_BATCH_SIZE", "100")),
+            flush_interval=float(os.getenv("TOOL_CALL_LOG_FLUSH_INTERVAL", "2.0"))
+        )
     
     def register_tool(self, tool_class: Type[BaseTool], custom_name: str = None) -> None:
         """Register a tool class with optional custom name for namespacing"""
@@ -37,6 +52,7 @@ class ToolRegistry:
         
         self._tools[tool_name] = tool_instance
         self._tool_classes[tool_name] = tool_class
+        self._tool_list_cache.clear()
     
     def get_tool(self, name: str) -> Optional[BaseTool]:
         """Get a tool by name"""
@@ -61,6 +77,17 @@ class ToolRegistry:
         
         return schemas
     
+    def list_tool_dicts(self, enabled_tools: List[str]) -> List[Dict[str, Any]]:
+        """List enabled tools in MCP format, serializing each distinct tool set once"""
+        cache_key = tuple(enabled_tools)
+        tools = self._tool_list_cache.get(cache_key)
+        if tools is None:
+            tools = _TOOL_SCHEMA_LIST.dump_python(self.list_tools(enabled_tools), by_alias=True, mode="json")
+            if len(self._tool_list_cache) >= 1024:
+                self._tool_list_cache.clear()
+            self._tool_list_cache[cache_key] = tools
+        return tools
+    
     def _get_enabled_tools(self) -> List[str]:
         """Get list of enabled tools from TOOLS environment variable"""
         tools_env = os.getenv("TOOLS", "")
@@ -114,6 +141,10 @@ class ToolRegistry:
 
     def discover_tools(self, tools_package: str = "src.tools") -> None:
         """Discover and register tools based on TOOLS environment variable"""
+        if self._discovered:
+            return
+        self._discovered = True
+        
         try:
             # Get enabled tools from environment
             enabled_tools = self._get_enabled_tools()
@@ -257,17 +288,18 @@ class ToolRegistry:
                     # For text/content responses, store in output_text
                     output_text = result.content
             
-            await db.create_tool_call(
-                client_id=client.id,
-                api_key_id=api_key_record.id,
-                tool_name=tool_name,
-                input_data=arguments,
-                output_text=output_text,
-                output_json=output_json,
-                error_message=result.content[0]["text"] if result.is_error and result.content else None,
-                execution_time_ms=execution_time_ms
-            )
-            logger.debug(f"Logged tool call: {tool_name} for client {client.name}")
+            # Buffer the record; it is written with other calls in a multi-row INSERT
+            self._call_buffer.add(db, {
+                "client_id": client.id,
+                "api_key_id": api_key_record.id,
+                "tool_name": tool_name,
+                "input_data": arguments,
+                "output_text": output_text,
+                "output_json": output_json,
+                "error_message": result.content[0]["text"] if result.is_error and result.content else None,
+                "execution_time_ms": execution_time_ms
+            })
+            logger.debug(f"Buffered tool call: {tool_name} for client {client.name}")
             
         except Exception as e:
             logger.error(f"Failed to log tool call: {e}")
@@ -299,17 +331,18 @@ class ToolRegistry:
                     # For text/content responses, store in output_text
                     output_text = result.content
             
-            await db.create_tool_call(
-                client_id=client.id,
-                api_key_id=api_key_record.id,
-                tool_name=tool_name,
-                input_data=arguments,
-                output_text=output_text,
-                output_json=output_json,
-                error_message=result.content[0]["text"] if result.is_error and result.content else None,
-                execution_time_ms=execution_time_ms
-            )
-            logger.debug(f"Background logged tool call: {tool_name} for client {client.name}")
+            # Buffer the record; it is written with other calls in a multi-row INSERT
+            self._call_buffer.add(db, {
+                "client_id": client.id,
+                "api_key_id": api_key_record.id,
+                "tool_name": tool_name,
+                "input_data": arguments,
+                "output_text": output_text,
+                "output_json": output_json,
+                "error_message": result.content[0]["text"] if result.is_error and result.content else None,
+                "execution_time_ms": execution_time_ms
+            })
+            logger.debug(f"Background buffered tool call: {tool_name} for client {client.name}")
             
         except Exception as e:
             logger.error(f"Failed to background log tool call: {e}")
@@ -335,9 +368,14 @@ class ToolRegistry:
         """Ensure queue is started (called once during app startup)"""
         if not self._queue_started:
             await self._queue.start()
+            await self._call_buffer.start()
             self._queue_started = True
             logger.info("Tool execution queue started")
     
+    async def flush_tool_calls(self):
+        """Stop the tool call buffer and write any pending records (called during app shutdown)"""
+        await self._call_buffer.stop()
+    
     def get_queue_stats(self) -> Dict[str, Any]:
         """Get current queue statistics"""
         return self._queue.get_stats()
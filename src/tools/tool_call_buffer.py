@@ -0,0 +1,90 @@
+"""
+Buffered writer for tool call tracking records
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ToolCallBuffer:
+    """Collects tool call records and writes them to the database in multi-row batches"""
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 2.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._records: List[Dict[str, Any]] = []
+        self._db = None
+        self._flush_task: Optional[asyncio.Task] = None
+        # Flush triggered by a full batch; at most one is pending at a time
+        self._batch_flush: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._started = False
+
+    async def start(self):
+        """Start the periodic flush task"""
+        if self._started:
+            return
+
+        logger.info(f"Starting tool call buffer with batch size {self.batch_size}, flush interval {self.flush_interval}s")
+        self._flush_task = asyncio.create_task(self._periodic_flush())
+        self._started = True
+
+    async def stop(self):
+        """Stop the periodic flush task and write any pending records"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        self._started = False
+        if self._batch_flush is not None:
+            await self._batch_flush
+            self._batch_flush = None
+        await self.flush()
+
+    def add(self, db, record: Dict[str, Any]) -> None:
+        """Add a tool call record to the buffer, flushing when the batch is full"""
+        self._db = db
+        # Stamp the call time now; the server default would be the (later) flush time
+        record.setdefault("created_at", datetime.now(timezone.utc))
+        self._records.append(record)
+
+        if len(self._records) >= self.batch_size and (self._batch_flush is None or self._batch_flush.done()):
+            self._batch_flush = asyncio.create_task(self._safe_flush())
+
+    async def flush(self) -> int:
+        """Write all buffered records in a single multi-row INSERT"""
+        async with self._lock:
+            if not self._records or not self._db:
+                return 0
+
+            records, self._records = self._records, []
+            written = await self._db.create_tool_calls(records)
+            if not written:
+                # One retry, since a failed batch loses every record in it
+                written = await self._db.create_tool_calls(records)
+                if not written:
+                    logger.error(f"Dropped {len(records)} tool call records after a failed retry")
+                    return 0
+
+            logger.debug(f"Flushed {written} tool call records")
+            return written
+
+    async def _safe_flush(self):
+        """Flush, logging errors instead of leaving them on an unobserved task"""
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush tool call records: {e}")
+
+    async def _periodic_flush(self):
+        """Flush buffered records on a fixed interval so low-traffic periods are not delayed"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._safe_flush()
@@ -0,0 +1,107 @@
+"""
+Compiled validators for the JSON schemas used by tools and resources
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Python types accepted for each JSON schema type
+_TYPE_CHECKS = {
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+    "null": type(None),
+}
+
+
+def _accept_any(value: Any) -> bool:
+    return True
+
+
+def _expected_types(schema_type: Any) -> Optional[Tuple[type, ...]]:
+    """Python types for a schema type or list of types; None accepts any value"""
+    type_names = schema_type if isinstance(schema_type, list) else [schema_type]
+    expected: List[type] = []
+    for type_name in type_names:
+        # Unknown (or unhashable) types are not checked
+        if not isinstance(type_name, str) or type_name not in _TYPE_CHECKS:
+            return None
+        python_type = _TYPE_CHECKS[type_name]
+        expected.extend(python_type if isinstance(python_type, tuple) else (python_type,))
+    return tuple(expected) or None
+
+
+def _compile_node(schema: Dict[str, Any]) -> Callable[[Any], bool]:
+    """Compile one schema node (and its children) into a check function"""
+    schema_type = schema.get("type")
+    expected_type = _expected_types(schema_type)
+    # bool is an int subclass but only matches an explicit "boolean"
+    allows_bool = expected_type is not None and bool in expected_type
+
+    # Nested object properties
+    required_fields = tuple(schema.get("required", []))
+    property_checks = {
+        field: _compile_node(field_schema)
+        for field, field_schema in schema.get("properties", {}).items()
+        if isinstance(field_schema, dict)
+    }
+    # Drop checks that accept anything so the hot loop skips them
+    property_checks = {field: check for field, check in property_checks.items() if check is not _accept_any}
+
+    # Array items
+    items_schema = schema.get("items")
+    item_check = _compile_node(items_schema) if isinstance(items_schema, dict) else _accept_any
+
+    if expected_type is None and not required_fields and not property_checks and item_check is _accept_any:
+        return _accept_any
+
+    def check(value: Any) -> bool:
+        if expected_type is not None:
+            if not isinstance(value, expected_type):
+                return False
+            if isinstance(value, bool) and not allows_bool:
+                return False
+
+        if isinstance(value, dict):
+            for field in required_fields:
+                if field not in value:
+                    return False
+            for field, field_value in value.items():
+                field_check = property_checks.get(field)
+                if field_check is not None and not field_check(field_value):
+                    return False
+
+        if item_check is not _accept_any and isinstance(value, list):
+            for item in value:
+                if not item_check(item):
+                    return False
+
+        return True
+
+    return check
+
+
+def compile_schema_validator(schema: Optional[Dict[str, Any]]) -> Callable[[Dict[str, Any]], bool]:
+    """Compile a JSON schema into a validator function (basic validation).
+
+    The schema is walked once here, so the returned function only does
+    membership and isinstance checks on each call. Covers type (including
+    type lists), required, and nested properties/items.
+    """
+    if not schema:
+        return lambda data: True
+
+    try:
+        check = _compile_node(schema)
+    except Exception:
+        # A schema we can't compile is not enforced
+        return lambda data: True
+
+    def validate(data: Dict[str, Any]) -> bool:
+        try:
+            return check(data)
+        except Exception:
+            return False
+
+    return validate